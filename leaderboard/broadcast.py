@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from leaderboard.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Store a new snapshot only if the stored one is still at the sequence the
+# delta was computed from, so two workers can never both publish seq + 1
+SNAPSHOT_CAS_LUA = """
+local current = redis.call('GET', KEYS[1])
+local seq = 0
+if current then
+    seq = cjson.decode(current)['seq']
+end
+if seq ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2])
+return 1
+"""
+
+_snapshot_cas_script = None
+
+
+def get_top_n():
+    return getattr(settings, "LEADERBOARD_TOP_N", 10)
+
+
+def snapshot_key(key):
+    return f"{key}:snapshot"
+
+
+def format_scores(scores):
+    # Scores read through Lua come back as strings rather than floats
+    return [{"user": user, "score": int(float(score))} for user, score in scores]
+
+
+def leaderboard_delta(previous, current):
+    """
+    Positional diff between two top-N lists.
+
+    Only ranks whose entry changed are sent; the client writes each one at
+    its rank and then truncates its board to ``size``.
+    """
+    changes = []
+    for index, entry in enumerate(current):
+        if index >= len(previous) or previous[index] != entry:
+            changes.append({"rank": index + 1, **entry})
+    return changes
+
+
+async def fetch_snapshot_json(key):
+    """
+    The last broadcast snapshot, already serialised.
+
+    Falls back to a live read at sequence 0 before the first broadcast;
+    the next delta is then computed against an empty board and so covers
+    every rank.
+    """
+    redis = get_async_redis()
+    snapshot = await redis.get(snapshot_key(key))
+    if snapshot is not None:
+        return snapshot
+
+    scores = await redis.zrevrange(key, 0, get_top_n() - 1, withscores=True)
+    return json.dumps({"type": "snapshot", "seq": 0, "leaderboard": format_scores(scores)})
+
+
+async def store_snapshot(key, previous_seq, leaderboard):
+    """ Save the board as snapshot previous_seq + 1, unless another worker got there first """
+    global _snapshot_cas_script
+    if _snapshot_cas_script is None:
+        _snapshot_cas_script = get_async_redis().register_script(SNAPSHOT_CAS_LUA)
+
+    snapshot = json.dumps({"type": "snapshot", "seq": previous_seq + 1, "leaderboard": leaderboard})
+    return bool(await _snapshot_cas_script(keys=[snapshot_key(key)], args=[previous_seq, snapshot]))
+
+
+class BroadcastCoalescer:
+    """
+    Batch leaderboard changes into ticks.
+
+    Consumers call mark_dirty() after a score change. Once per tick the
+    coalescer reads the top-N a single time, diffs it against the stored
+    snapshot and pushes the serialised delta to the group, so group members
+    never query Redis or serialise the board themselves.
+    A short Redis lock per board stops several worker processes from
+    broadcasting the same tick twice; a worker that loses the lock keeps
+    the board dirty and tries again on its next tick. The lock only
+    throttles: if a slow tick outlives it, the compare-and-set on the
+    snapshot's seq lets just one worker publish each seq, and the other
+    retries against the new snapshot.
+    """
+
+    def __init__(self):
+        self._dirty = set()
+        self._task = None
+
+    @property
+    def interval(self):
+        return getattr(settings, "LEADERBOARD_BROADCAST_INTERVAL", 0.2)
+
+    def mark_dirty(self, key, group_name):
+        self._dirty.add((key, group_name))
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while self._dirty:
+            await asyncio.sleep(self.interval)
+            boards, self._dirty = self._dirty, set()
+            for key, group_name in boards:
+                try:
+                    if not await self._broadcast(key, group_name):
+                        self._dirty.add((key, group_name))
+                except Exception:
+                    logger.exception("Leaderboard broadcast failed for %s", key)
+
+    async def _broadcast(self, key, group_name):
+        lock_ms = max(int(self.interval * 1000), 1)
+        redis = get_async_redis()
+        if not await redis.set(f"{key}:tick", 1, nx=True, px=lock_ms):
+            return False
+
+        pipe = redis.pipeline(transaction=False)
+        pipe.zrevrange(key, 0, get_top_n() - 1, withscores=True)
+        pipe.get(snapshot_key(key))
+        scores, snapshot = await pipe.execute()
+
+        previous = json.loads(snapshot) if snapshot else {"seq": 0, "leaderboard": []}
+        current = format_scores(scores)
+        changes = leaderboard_delta(previous["leaderboard"], current)
+        if not changes and len(current) == len(previous["leaderboard"]):
+            return True
+
+        seq = previous["seq"] + 1
+        if not await store_snapshot(key, previous["seq"], current):
+            return False
+        await get_channel_layer().group_send(
+            group_name,
+            {
+                "type": "broadcast_leaderboard",
+                "text": json.dumps({
+                    "type": "delta",
+                    "seq": seq,
+                    "size": len(current),
+                    "changes": changes,
+                }),
+            }
+        )
+        return True
+
+
+coalescer = BroadcastCoalescer()
@@ -0,0 +1,108 @@
+import asyncio
+import atexit
+
+from django.conf import settings
+
+from leaderboard.broadcast import coalescer
+from leaderboard.redis_client import (
+    GLOBAL_LEADERBOARD_DIRTY_KEY,
+    GLOBAL_LEADERBOARD_KEY,
+    get_async_redis,
+    get_redis,
+)
+
+
+def _queue_increment(pipe, key, username, increment):
+    """ Queue one user's increment; returns how many replies it adds """
+    pipe.zincrby(key, increment, username)
+    pipe.zrevrank(key, username)
+    if key == GLOBAL_LEADERBOARD_KEY:
+        # Only the site-wide board is backed up to Postgres
+        pipe.sadd(GLOBAL_LEADERBOARD_DIRTY_KEY, username)
+        return 3
+    return 2
+
+
+class ScoreBuffer:
+    """
+    Write-behind buffer for score increments, one per ASGI worker.
+
+    add() folds increments for the same user on the same board together
+    and resolves to that user's (new_score, rank) once written. Pending
+    increments go to Redis as a single MULTI/EXEC when the buffer holds
+    LEADERBOARD_WRITE_BUFFER_SIZE users, or LEADERBOARD_WRITE_BUFFER_INTERVAL
+    seconds after the first one arrived, whichever comes first.
+    """
+
+    def __init__(self):
+        # (key, group_name, username) -> [increment, futures waiting on it]
+        self._pending = {}
+        self._timer = None
+        self._flush_task = None
+
+    async def add(self, key, group_name, username, score):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = self._pending.setdefault((key, group_name, username), [0, []])
+        entry[0] += score
+        entry[1].append(future)
+
+        if len(self._pending) >= getattr(settings, "LEADERBOARD_WRITE_BUFFER_SIZE", 500):
+            await self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(
+                getattr(settings, "LEADERBOARD_WRITE_BUFFER_INTERVAL", 0.005), self._flush_soon
+            )
+        return await future
+
+    def _flush_soon(self):
+        self._timer = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        """ Write everything pending in one transaction and wake the waiting submitters """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        pipe = get_async_redis().pipeline(transaction=True)
+        widths = [
+            _queue_increment(pipe, key, username, increment)
+            for (key, _, username), (increment, _) in batch.items()
+        ]
+
+        try:
+            results = await pipe.execute()
+        except Exception as e:
+            for _, futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        index = 0
+        for ((key, group_name, _), (_, futures)), width in zip(batch.items(), widths):
+            new_score, rank = results[index], results[index + 1]
+            index += width
+            for future in futures:
+                if not future.done():
+                    future.set_result((new_score, rank))
+            coalescer.mark_dirty(key, group_name)
+
+    def flush_sync(self):
+        """ Last-chance flush at interpreter exit, when the event loop is gone """
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        pipe = get_redis().pipeline(transaction=True)
+        for (key, _, username), (increment, _) in batch.items():
+            _queue_increment(pipe, key, username, increment)
+        pipe.execute()
+
+
+score_buffer = ScoreBuffer()
+atexit.register(score_buffer.flush_sync)
@@ -1,56 +1,144 @@
 import json
-import redis
 from channels.generic.websocket import AsyncWebsocketConsumer
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from django.conf import settings
 
-r = redis.Redis(host="127.0.0.1", port=6379, db=0, decode_responses=True)
+from leaderboard.broadcast import fetch_snapshot_json, format_scores
+from leaderboard.buffer import score_buffer
+from leaderboard.redis_client import board_names, get_async_redis
+
+# ZREVRANK and the surrounding ZREVRANGE in one round trip
+AROUND_ME_LUA = """
+local rank = redis.call('ZREVRANK', KEYS[1], ARGV[1])
+if not rank then
+    return false
+end
+local start = math.max(rank - tonumber(ARGV[2]), 0)
+return {rank, start, redis.call('ZREVRANGE', KEYS[1], start, rank + tonumber(ARGV[2]), 'WITHSCORES')}
+"""
+
+_around_me_script = None
+
+
+async def fetch_around_me(key, username, window):
+    """ Return (rank, entries) for the ``window`` places either side of a user, or None if unranked """
+    global _around_me_script
+    if _around_me_script is None:
+        _around_me_script = get_async_redis().register_script(AROUND_ME_LUA)
+
+    result = await _around_me_script(keys=[key], args=[username, window])
+    if not result:
+        return None
+
+    rank, start, flat = result
+    pairs = zip(flat[::2], flat[1::2])
+    entries = [
+        {"rank": start + offset + 1, **entry}
+        for offset, entry in enumerate(format_scores(pairs))
+    ]
+    return rank + 1, entries
 
 
 class LeaderboardConsumer(AsyncWebsocketConsumer):
+    """
+    Live leaderboard socket.
+
+    Server -> client messages:
+        {"type": "snapshot", "seq": n, "leaderboard": [{"user", "score"}, ...]}
+            sent on connect and on resync
+        {"type": "delta", "seq": n, "size": k, "changes": [{"rank", "user", "score"}, ...]}
+            apply each change at its rank, then truncate the board to size
+        {"type": "score", "user", "score", "rank"}
+            acknowledgement of the client's own submission
+        {"type": "top", "leaderboard": [...]}
+        {"type": "around_me", "user", "rank", "entries": [{"rank", "user", "score"}, ...]}
+            replies to the matching actions below; rank is null if unranked
+
+    Client -> server messages:
+        {"user": "...", "score": 5}     add to a user's score
+        {"action": "resync"}            request a fresh snapshot
+        {"action": "top", "n": 50}      one-off top-N read, up to LEADERBOARD_TOP_N_MAX
+        {"action": "around_me", "user": "...", "window": 5}
+                                        the user's rank and the places either side
+
+    The socket joins the site-wide board at ws/leaderboard/, or a single
+    room's board at ws/leaderboard/quiz/<id>/ or ws/leaderboard/classroom/<id>/.
+
+    Deltas with seq <= the client's current seq are stale and can be dropped.
+    A delta with seq > current + 1 means one was missed, and the client
+    should send a resync.
+    """
+
     async def connect(self):
         await self.accept()
-        self.group_name = "leaderboard_group"
+        route = self.scope["url_route"]["kwargs"]
+        self.board_key, self.group_name = board_names(route.get("scope"), route.get("room_id"))
 
         # Join the group
         await self.channel_layer.group_add(self.group_name, self.channel_name)
 
         # Send the current leaderboard on connection
-        await self.send_leaderboard()
+        await self.send_snapshot()
 
     async def disconnect(self, close_code):
         # Leave the group
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
+        # Don't leave this worker's buffered scores behind if it is shutting down
+        await score_buffer.flush()
+
     async def receive(self, text_data):
         try:
             data = json.loads(text_data)
+            action = data.get("action")
+            if action == "resync":
+                await self.send_snapshot()
+                return
+            if action == "top":
+                await self.send_top(int(data.get("n", settings.LEADERBOARD_TOP_N)))
+                return
+            if action == "around_me":
+                await self.send_around_me(data["user"], int(data.get("window", settings.LEADERBOARD_AROUND_ME_WINDOW)))
+                return
+
             username = data["user"]
             score = int(data["score"])
 
-            # Update score in Redis (overwrite the score)
-            current_score = r.zscore("leaderboard", username) or 0
-            r.zadd("leaderboard", {username: current_score + score})
+            # Buffered increment, written with other submissions in one MULTI/EXEC
+            new_score, rank = await score_buffer.add(self.board_key, self.group_name, username, score)
 
-            # Broadcast updated leaderboard to all clients
-            await self.channel_layer.group_send(
-                self.group_name,
-                {
-                    "type": "broadcast_leaderboard"
-                }
-            )
+            # Tell the submitter where they now stand
+            await self.send(text_data=json.dumps({
+                "type": "score",
+                "user": username,
+                "score": int(new_score),
+                "rank": rank + 1,
+            }))
 
         except Exception as e:
             await self.send(text_data=json.dumps({"error": str(e)}))
 
     async def broadcast_leaderboard(self, event):
-        """ Send updated leaderboard to all connected clients """
-        await self.send_leaderboard()
-
-    async def send_leaderboard(self):
-        """ Fetch leaderboard from Redis and send to client """
-        scores = r.zrevrange("leaderboard", 0, 9, withscores=True)
-        formatted_scores = [
-            {"user": user, "score": int(score)} for user, score in scores
-        ]
-        await self.send(text_data=json.dumps({"leaderboard": formatted_scores}))
+        """ Forward the coalescer's precomputed delta to this client """
+        await self.send(text_data=event["text"])
+
+    async def send_snapshot(self):
+        """ Send the full leaderboard and its sequence number to this client """
+        await self.send(text_data=await fetch_snapshot_json(self.board_key))
+
+    async def send_top(self, n):
+        """ Send a one-off top-N read, capped at LEADERBOARD_TOP_N_MAX """
+        n = max(1, min(n, settings.LEADERBOARD_TOP_N_MAX))
+        scores = await get_async_redis().zrevrange(self.board_key, 0, n - 1, withscores=True)
+        await self.send(text_data=json.dumps({"type": "top", "leaderboard": format_scores(scores)}))
+
+    async def send_around_me(self, username, window):
+        """ Send a user's rank and the neighbouring places on this board """
+        window = max(0, min(window, settings.LEADERBOARD_AROUND_ME_MAX))
+        result = await fetch_around_me(self.board_key, username, window)
+        rank, entries = result if result else (None, [])
+        await self.send(text_data=json.dumps({
+            "type": "around_me",
+            "user": username,
+            "rank": rank,
+            "entries": entries,
+        }))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from leaderboard.tasks import RESTORE_BATCH_SIZE, restore_leaderboard_from_postgres
+
+
+class Command(BaseCommand):
+    help = "Reload the Redis leaderboard from the last PostgreSQL backup (run on deploy or after a Redis restart)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RESTORE_BATCH_SIZE,
+            help="Rows per pipelined ZADD batch",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(
+            restore_leaderboard_from_postgres(batch_size=options["batch_size"])
+        ))
@@ -0,0 +1,58 @@
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+_async_client = None
+
+
+def _client_options():
+    return {
+        "max_connections": getattr(settings, "LEADERBOARD_REDIS_MAX_CONNECTIONS", 50),
+        "socket_timeout": getattr(settings, "LEADERBOARD_REDIS_SOCKET_TIMEOUT", 5),
+        "socket_connect_timeout": getattr(settings, "LEADERBOARD_REDIS_CONNECT_TIMEOUT", 2),
+        "decode_responses": True,
+    }
+
+
+def get_redis():
+    """ Synchronous client for Celery tasks and management commands """
+    return redis.Redis.from_url(settings.LEADERBOARD_REDIS_URL, **_client_options())
+
+
+def get_async_redis():
+    """
+    Shared asyncio client for the WebSocket consumers.
+
+    Built lazily on first use so the pool binds to the worker's event loop.
+    The pool blocks for up to LEADERBOARD_REDIS_POOL_TIMEOUT seconds when
+    every connection is busy instead of raising, so bursts queue up rather
+    than failing.
+    """
+    global _async_client
+    if _async_client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            settings.LEADERBOARD_REDIS_URL,
+            timeout=getattr(settings, "LEADERBOARD_REDIS_POOL_TIMEOUT", 5),
+            **_client_options()
+        )
+        _async_client = aioredis.Redis(connection_pool=pool)
+    return _async_client
+
+
+GLOBAL_LEADERBOARD_KEY = "leaderboard"
+GLOBAL_LEADERBOARD_GROUP = "leaderboard_group"
+# Users whose global score changed since the last Postgres backup
+GLOBAL_LEADERBOARD_DIRTY_KEY = "leaderboard:dirty"
+
+
+def board_names(scope=None, room_id=None):
+    """
+    Redis sorted-set key and channel-layer group for a leaderboard.
+
+    With no scope this is the site-wide board; otherwise each quiz or
+    classroom gets its own key and group, so a room's broadcasts only
+    reach its own subscribers.
+    """
+    if scope is None:
+        return GLOBAL_LEADERBOARD_KEY, GLOBAL_LEADERBOARD_GROUP
+    return f"leaderboard:{scope}:{room_id}", f"leaderboard_{scope}_{room_id}"
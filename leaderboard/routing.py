@@ -3,4 +3,8 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/leaderboard/$', consumers.LeaderboardConsumer.as_asgi()),
+    re_path(
+        r'ws/leaderboard/(?P<scope>quiz|classroom)/(?P<room_id>[A-Za-z0-9_-]{1,64})/$',
+        consumers.LeaderboardConsumer.as_asgi(),
+    ),
 ]
@@ -1,15 +1,140 @@
+import logging
+import uuid
+
 from celery import shared_task
+from django.contrib.auth import get_user_model
+from redis.exceptions import ResponseError
 from leaderboard.models import LeaderboardBackup
-import redis
+from leaderboard.redis_client import (
+    GLOBAL_LEADERBOARD_DIRTY_KEY,
+    GLOBAL_LEADERBOARD_KEY,
+    get_redis,
+)
 
-@shared_task
-def backup_leaderboard_to_postgres():
-    r = redis.Redis(host="127.0.0.1", port=6379, db=0, decode_responses=True)
-    scores = r.zrevrange("leaderboard", 0, -1, withscores=True)
+logger = logging.getLogger(__name__)
+
+BACKUP_CHUNK_SIZE = 1000
+# Each backup run renames the dirty set to a key of its own, so overlapping
+# runs never scan or delete each other's users
+BACKUP_RUN_KEY = "leaderboard:dirty:run:{run_id}"
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _upsert_scores(pairs):
+    """
+    Write a chunk of (username, score) pairs with one INSERT ... ON CONFLICT.
 
-    for username, score in scores:
-        LeaderboardBackup.objects.update_or_create(
-            user=username, defaults={"score": int(score)}
+    Returns (rows written, usernames skipped because no User has them).
+    """
+    scores = dict(pairs)
+    users = dict(get_user_model().objects.filter(username__in=scores).values_list("username", "id"))
+    rows = [
+        LeaderboardBackup(user_id=user_id, score=int(scores[username]))
+        for username, user_id in users.items()
+    ]
+    LeaderboardBackup.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=["user"], update_fields=["score"]
+    )
+    skipped = [username for username in scores if username not in users]
+    if skipped:
+        logger.warning(
+            "Leaderboard backup skipped %d scores with no matching user: %s",
+            len(skipped), ", ".join(skipped[:20]),
         )
+    return len(rows), len(skipped)
+
+
+def _backup_chunks(chunks):
+    written = skipped = 0
+    for chunk in chunks:
+        chunk_written, chunk_skipped = _upsert_scores(chunk)
+        written += chunk_written
+        skipped += chunk_skipped
+    return f"Backed up {written} records to PostgreSQL ({skipped} skipped with no matching user)."
+
+
+@shared_task
+def backup_leaderboard_to_postgres(full=False):
+    """
+    Copy leaderboard scores from Redis into LeaderboardBackup.
+
+    By default only users in the dirty set (scored since the last backup)
+    are written. Pass full=True to stream the whole sorted set with ZSCAN,
+    e.g. to seed an empty table.
+    """
+    r = get_redis()
+
+    if full:
+        pairs = r.zscan_iter(GLOBAL_LEADERBOARD_KEY, count=BACKUP_CHUNK_SIZE)
+        return _backup_chunks(_chunks(pairs, BACKUP_CHUNK_SIZE))
+
+    # Claim the dirty set atomically under a key only this run uses
+    run_key = BACKUP_RUN_KEY.format(run_id=uuid.uuid4().hex)
+    try:
+        r.rename(GLOBAL_LEADERBOARD_DIRTY_KEY, run_key)
+    except ResponseError as e:
+        if "no such key" not in str(e).lower():
+            raise
+        return _backup_chunks([])  # nobody scored since the last backup
+
+    def dirty_scores():
+        for usernames in _chunks(r.sscan_iter(run_key, count=BACKUP_CHUNK_SIZE), BACKUP_CHUNK_SIZE):
+            scores = r.zmscore(GLOBAL_LEADERBOARD_KEY, usernames)
+            yield [(username, score) for username, score in zip(usernames, scores) if score is not None]
+
+    try:
+        result = _backup_chunks(dirty_scores())
+    except Exception:
+        # Hand the claimed users back to the dirty set for the next run
+        pipe = r.pipeline(transaction=True)
+        pipe.sunionstore(GLOBAL_LEADERBOARD_DIRTY_KEY, [GLOBAL_LEADERBOARD_DIRTY_KEY, run_key])
+        pipe.delete(run_key)
+        pipe.execute()
+        raise
+
+    r.delete(run_key)
+    return result
+
+
+RESTORE_BATCH_SIZE = 5000
+RESTORE_STAGING_KEY = "leaderboard:restore"
+
+
+@shared_task
+def restore_leaderboard_from_postgres(batch_size=RESTORE_BATCH_SIZE):
+    """
+    Reload the site-wide sorted set from LeaderboardBackup.
+
+    Rows are streamed from Postgres and ZADDed into a staging key in
+    pipelined batches, then merged into the live key with a single
+    ZUNIONSTORE ... AGGREGATE MAX. Sockets never see an empty or
+    half-loaded board, a live score that is already ahead of the backup
+    is kept, and running the restore twice is harmless.
+    """
+    r = get_redis()
+    r.delete(RESTORE_STAGING_KEY)
+
+    rows = LeaderboardBackup.objects.values_list("user__username", "score").iterator(chunk_size=batch_size)
+    count = 0
+    for chunk in _chunks(rows, batch_size):
+        pipe = r.pipeline(transaction=False)
+        pipe.zadd(RESTORE_STAGING_KEY, dict(chunk))
+        pipe.execute()
+        count += len(chunk)
+
+    pipe = r.pipeline(transaction=True)
+    pipe.zunionstore(GLOBAL_LEADERBOARD_KEY, [GLOBAL_LEADERBOARD_KEY, RESTORE_STAGING_KEY], aggregate="MAX")
+    pipe.delete(RESTORE_STAGING_KEY)
+    pipe.execute()
 
-    return f"Backed up {len(scores)} records to PostgreSQL."
+    return f"Restored {count} records from PostgreSQL."
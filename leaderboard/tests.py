@@ -1,3 +1,59 @@
-from django.test import TestCase
+import random
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from leaderboard.broadcast import format_scores, leaderboard_delta
+
+
+def apply_delta(board, size, changes):
+    """ What the client does with a delta message: write each change at its rank, then truncate """
+    board = list(board)
+    for change in changes:
+        index = change["rank"] - 1
+        entry = {"user": change["user"], "score": change["score"]}
+        if index < len(board):
+            board[index] = entry
+        else:
+            board.append(entry)
+    return board[:size]
+
+
+class LeaderboardDeltaTests(SimpleTestCase):
+    def board(self, *users):
+        return [{"user": user, "score": score} for user, score in users]
+
+    def test_unchanged_board_has_no_changes(self):
+        board = self.board(("a", 3), ("b", 2))
+        self.assertEqual(leaderboard_delta(board, list(board)), [])
+
+    def test_only_changed_ranks_are_sent(self):
+        previous = self.board(("a", 3), ("b", 2), ("c", 1))
+        current = self.board(("b", 4), ("a", 3), ("c", 1))
+        self.assertEqual(
+            leaderboard_delta(previous, current),
+            [{"rank": 1, "user": "b", "score": 4}, {"rank": 2, "user": "a", "score": 3}],
+        )
+
+    def test_first_delta_covers_every_rank(self):
+        current = self.board(("a", 3), ("b", 2))
+        self.assertEqual(apply_delta([], len(current), leaderboard_delta([], current)), current)
+
+    def test_shrinking_board_is_truncated_by_size(self):
+        previous = self.board(("a", 3), ("b", 2), ("c", 1))
+        current = self.board(("a", 3))
+        changes = leaderboard_delta(previous, current)
+        self.assertEqual(changes, [])
+        self.assertEqual(apply_delta(previous, len(current), changes), current)
+
+    def test_client_replaying_deltas_tracks_the_board(self):
+        rng = random.Random(4)
+        client, previous = [], []
+        for _ in range(200):
+            scores = {f"user{i}": rng.randint(0, 50) for i in rng.sample(range(30), rng.randint(0, 10))}
+            current = format_scores(sorted(scores.items(), key=lambda item: -item[1]))
+            client = apply_delta(client, len(current), leaderboard_delta(previous, current))
+            self.assertEqual(client, current)
+            previous = current
+
+    def test_format_scores_accepts_lua_strings(self):
+        self.assertEqual(format_scores([("a", "12"), ("b", 3.0)]), self.board(("a", 12), ("b", 3)))
@@ -0,0 +1,94 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchGenerator:
+    """
+    Micro-batching front end for a seq2seq model's ``generate``.
+
+    Callers submit one input text each and wait on a Future. A single
+    background thread takes requests off the queue, waits up to
+    ``max_wait`` seconds for up to ``max_batch_size`` of them, pads them
+    into one tensor and runs one ``generate`` call for the whole batch.
+    On CPU one padded batch is much cheaper than the same inputs run one
+    after another.
+
+    ``load`` is a zero-argument callable returning (model, tokenizer), so
+    the model comes from the shared registry and only loads on first use.
+    """
+
+    def __init__(self, load, max_batch_size=8, max_wait=0.05, max_input_length=512, **generate_kwargs):
+        self.load = load
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_input_length = max_input_length
+        self.generate_kwargs = generate_kwargs
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, text, num_return_sequences=1):
+        """Queue one input; the Future resolves to its list of decoded outputs"""
+        future = Future()
+        self._queue.put((text, num_return_sequences, future))
+        self._ensure_worker()
+        return future
+
+    def generate(self, text, num_return_sequences=1, timeout=None):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(text, num_return_sequences).result(timeout)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="batch-generator", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self._run(batch)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _run(self, batch):
+        model, tokenizer = self.load()
+        texts = [text for text, _, _ in batch]
+        # With beam search the top-n beams are the same whatever n is, so
+        # the batch runs at the largest n and each caller keeps its own n
+        n = max(num for _, num, _ in batch)
+
+        inputs = tokenizer(
+            texts, return_tensors="pt", padding=True, truncation=True, max_length=self.max_input_length
+        )
+        outputs = model.generate(
+            input_ids=inputs["input_ids"],
+            attention_mask=inputs["attention_mask"],
+            num_return_sequences=n,
+            **self.generate_kwargs
+        )
+        decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        return [
+            decoded[i * n:i * n + num]
+            for i, (_, num, _) in enumerate(batch)
+        ]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Compare the question-generator backends on CPU.
+
+Each backend runs in its own process so peak memory is measured cleanly.
+Reports load time, median and p95 generate() latency, peak RSS, and how
+many of the fp32 PyTorch questions each backend reproduces.
+
+Usage: python -m mlapp.ml.benchmark_backends [--runs 10] [--backends pytorch quantized onnx]
+"""
+import argparse
+import multiprocessing
+import resource
+import statistics
+import time
+
+SAMPLE_TEXT = (
+    "Machine learning is a field of artificial intelligence that uses statistical techniques to give "
+    "computer systems the ability to 'learn' from data, without being explicitly programmed. The name "
+    "machine learning was coined in 1959 by Arthur Samuel. Machine learning algorithms build a model "
+    "based on sample data, known as training data, in order to make predictions or decisions without "
+    "being explicitly programmed to do so."
+)
+
+
+def run_backend(backend, runs, results):
+    import torch
+    from mlapp.ml.mcq_generation import GENERATION_KWARGS, initialize_question_generator
+
+    start = time.perf_counter()
+    model, tokenizer = initialize_question_generator(backend=backend)
+    load_time = time.perf_counter() - start
+
+    inputs = tokenizer(f"generate questions: {SAMPLE_TEXT}", return_tensors="pt", max_length=512, truncation=True)
+    latencies = []
+    with torch.no_grad():
+        for _ in range(runs):
+            start = time.perf_counter()
+            outputs = model.generate(**inputs, num_return_sequences=10, **GENERATION_KWARGS)
+            latencies.append(time.perf_counter() - start)
+
+    results[backend] = {
+        "load_s": load_time,
+        "median_s": statistics.median(latencies),
+        "p95_s": sorted(latencies)[max(int(len(latencies) * 0.95) - 1, 0)],
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "questions": tokenizer.batch_decode(outputs, skip_special_tokens=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--backends", nargs="+", default=["pytorch", "quantized", "onnx"])
+    args = parser.parse_args()
+
+    manager = multiprocessing.Manager()
+    results = manager.dict()
+    for backend in args.backends:
+        process = multiprocessing.Process(target=run_backend, args=(backend, args.runs, results))
+        process.start()
+        process.join()
+        if backend not in results:
+            print(f"{backend}: failed (see traceback above)")
+
+    baseline = set(results["pytorch"]["questions"]) if "pytorch" in results else None
+    print(f"\n{'backend':<10} {'load s':>8} {'median s':>9} {'p95 s':>8} {'peak MB':>9} {'parity':>7}")
+    for backend in args.backends:
+        if backend not in results:
+            continue
+        r = results[backend]
+        parity = (
+            f"{len(baseline & set(r['questions'])) / len(baseline):.0%}" if baseline else "n/a"
+        )
+        print(f"{backend:<10} {r['load_s']:>8.2f} {r['median_s']:>9.3f} {r['p95_s']:>8.3f} "
+              f"{r['peak_rss_mb']:>9.0f} {parity:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""
+Compare serial and multi-process PDF page extraction.
+
+Extracts every page of the given PDF with each worker count and reports
+median wall time, speedup over the serial run, and whether the output
+text matches the serial output exactly.
+
+Usage: python -m mlapp.ml.benchmark_pdf_extraction book.pdf [--runs 3] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import statistics
+import time
+
+
+def run(path, workers, runs):
+    from mlapp.ml.pdf_extraction import iter_pdf_pages
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        text = "\n\n".join(iter_pdf_pages(path, workers))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    # Always include the serial path as the baseline
+    worker_counts = sorted(set(args.workers) | {1})
+    serial_s, serial_text = run(args.pdf, 1, args.runs)
+
+    print(f"\n{'workers':>7} {'median s':>9} {'speedup':>8} {'parity':>7}")
+    for workers in worker_counts:
+        median_s, text = (serial_s, serial_text) if workers == 1 else run(args.pdf, workers, args.runs)
+        parity = "yes" if text == serial_text else "NO"
+        print(f"{workers:>7} {median_s:>9.3f} {serial_s / median_s:>7.2f}x {parity:>7}")
+
+
+if __name__ == "__main__":
+    main()
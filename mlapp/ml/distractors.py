@@ -0,0 +1,124 @@
+import re
+import zlib
+
+import numpy as np
+
+from mlapp.ml.document import PROPER_NOUN_PATTERN, WHOLE_NUMBER_PATTERN, as_document
+
+# Character n-gram hashing space for candidate vectors
+VECTOR_DIMS = 2048
+NGRAM = 3
+# Candidates at least this similar to the answer are treated as the answer itself
+MAX_SIMILARITY = 0.9
+
+PHRASE_WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'-]*")
+CONTENT_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'-]*")
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have how i if in into is it its
+may more most no not of on or our so such than that the their them then there these they this those to
+was we were what when where which while who why will with would you your also very using used known
+""".split())
+
+
+def candidate_kind(phrase):
+    if WHOLE_NUMBER_PATTERN.fullmatch(phrase):
+        return 'number'
+    if PROPER_NOUN_PATTERN.fullmatch(phrase):
+        return 'entity'
+    return 'phrase'
+
+
+def content_words(phrase):
+    """Lower-cased words of a phrase that aren't stopwords"""
+    return frozenset(word for word in CONTENT_WORD_PATTERN.findall(phrase.lower()) if word not in STOPWORDS)
+
+
+def vectorize(phrases):
+    """L2-normalised hashed character n-gram counts, one row per phrase"""
+    matrix = np.zeros((len(phrases), VECTOR_DIMS), dtype=np.float32)
+    for row, phrase in enumerate(phrases):
+        padded = f" {phrase.lower()} "
+        for i in range(max(len(padded) - NGRAM + 1, 1)):
+            matrix[row, zlib.crc32(padded[i:i + NGRAM].encode('utf-8')) % VECTOR_DIMS] += 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+class DistractorEngine:
+    """Candidate-phrase pool for one document, ranked by similarity to each answer
+
+    The pool (entities, numbers and short content phrases) and its vectors
+    are built once. pick() scores every answer against every candidate
+    with one matrix product, then keeps the closest candidates of the same
+    kind that share no content word with the answer or with each other.
+    """
+
+    def __init__(self, text):
+        doc = as_document(text)
+        pool = {}
+        for entity in PROPER_NOUN_PATTERN.findall(doc.text):
+            words = entity.split()
+            # "The Dartmouth workshop" -> "Dartmouth"
+            while words and words[0].lower() in STOPWORDS:
+                words.pop(0)
+            if words:
+                pool[" ".join(words)] = None
+        pool.update(dict.fromkeys(WHOLE_NUMBER_PATTERN.findall(doc.text)))
+        for sentence in doc.sentences:
+            words = PHRASE_WORD_PATTERN.findall(sentence)
+            for size in (1, 2, 3):
+                for i in range(len(words) - size + 1):
+                    span = words[i:i + size]
+                    if span[0].lower() in STOPWORDS or span[-1].lower() in STOPWORDS or len(span[-1]) < 3:
+                        continue
+                    pool[" ".join(span)] = None
+
+        # A lone capitalised word is only an entity if it is capitalised
+        # somewhere other than the start of a sentence and never appears in
+        # lower case; otherwise it is a common word like "Machine" or "The"
+        words_in_text = set(PHRASE_WORD_PATTERN.findall(doc.text))
+        mid_sentence = {word for sentence in doc.sentences for word in PHRASE_WORD_PATTERN.findall(sentence)[1:]}
+        self.candidates = [
+            candidate for candidate in pool
+            if " " in candidate or not candidate[:1].isupper()
+            or (candidate in mid_sentence and candidate.lower() not in words_in_text)
+        ]
+        self.lowered = np.array([candidate.lower() for candidate in self.candidates], dtype=object)
+        self.kinds = np.array([candidate_kind(candidate) for candidate in self.candidates], dtype=object)
+        self.content_words = [content_words(candidate) for candidate in self.candidates]
+        self.vectors = vectorize(self.candidates)
+
+    def pick(self, answers, k=3):
+        """Return a list of up to k distractors for each answer"""
+        if not answers or not self.candidates:
+            return [[] for _ in answers]
+
+        similarity = vectorize(answers) @ self.vectors.T
+        results = []
+        for row, answer in enumerate(answers):
+            scores = similarity[row].copy()
+            kind = candidate_kind(answer)
+            # Prefer the same kind of thing as the answer; numbers only ever get numbers
+            mismatched = self.kinds != kind
+            if kind == 'number':
+                scores[mismatched] = -np.inf
+            else:
+                scores[mismatched] -= 1.0
+            scores[scores >= MAX_SIMILARITY] = -np.inf
+
+            chosen = []
+            used_words = set(content_words(answer))
+            answer_lowered = answer.lower()
+            for index in np.argsort(-scores):
+                if not np.isfinite(scores[index]) or len(chosen) == k:
+                    break
+                candidate = self.lowered[index]
+                words = self.content_words[index]
+                # Skip anything that shares a content word with the answer or an
+                # option already chosen, and fragments of the answer like "1959"
+                if not words or words & used_words or candidate in answer_lowered or answer_lowered in candidate:
+                    continue
+                chosen.append(self.candidates[index])
+                used_words |= words
+            results.append(chosen)
+        return results
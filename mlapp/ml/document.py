@@ -0,0 +1,175 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from functools import cached_property
+
+from nltk.tokenize import sent_tokenize
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+NUMBER_PATTERN = re.compile(r'\d+')
+WHOLE_NUMBER_PATTERN = re.compile(r'\b\d+\b')
+YEAR_PATTERN = re.compile(r'\b\d{4}\b')
+KEYWORD_PATTERN = re.compile(r'important|significant|key|main|critical|essential')
+PROPER_NOUN_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+DATE_PATTERN = re.compile(
+    r'\b\d{4}\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?,\s+\d{4}\b'
+)
+LOCATION_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:,\s+[A-Z][a-z]+)?\b')
+
+
+def split_sentences(text):
+    """Sentence-split with NLTK, falling back to splitting on periods"""
+    try:
+        return sent_tokenize(text)
+    except Exception as e:
+        print(f"Error tokenizing text: {e}")
+        return [s.strip() + '.' for s in text.split('.') if s.strip()]
+
+def _last_sentence_start(text, sentences):
+    """Offset in text where the last of its split sentences begins"""
+    start = position = 0
+    for sentence in sentences:
+        # The fallback splitter appends a period the text may not have
+        content = sentence.rstrip('.')
+        found = text.find(content, position) if content else -1
+        if found != -1:
+            start, position = found, found + len(content)
+    return start
+
+def iter_sentences(chunks):
+    """Sentence-split a stream of text chunks (e.g. PDF pages) lazily
+
+    The last sentence of each chunk may run on into the next one, so the raw
+    text it was split from is held back and re-split together with the
+    following chunk. Only one chunk plus that tail is in memory at a time.
+    """
+    tail = ""
+    for chunk in chunks:
+        text = f"{tail} {chunk}" if tail else chunk
+        sentences = split_sentences(text)
+        if not sentences:
+            continue
+        tail = text[_last_sentence_start(text, sentences):]
+        yield from sentences[:-1]
+    if tail:
+        yield from split_sentences(tail)
+
+
+class SentenceIndex:
+    """Inverted index from word to sentence ids, with precomputed BM25 weights
+
+    Built once per document. A query only touches the postings of its own
+    words, so looking up context for many questions no longer rescans
+    every sentence each time.
+    """
+
+    def __init__(self, tokenized_sentences, k1=1.5, b=0.75):
+        self.size = len(tokenized_sentences)
+        lengths = [len(tokens) for tokens in tokenized_sentences]
+        average_length = (sum(lengths) / self.size) if self.size else 0
+
+        counts = [Counter(tokens) for tokens in tokenized_sentences]
+        document_frequency = Counter(word for sentence_counts in counts for word in sentence_counts)
+
+        self.postings = defaultdict(list)
+        for sentence_id, (sentence_counts, length) in enumerate(zip(counts, lengths)):
+            norm = k1 * (1 - b + b * length / average_length) if average_length else k1
+            for word, tf in sentence_counts.items():
+                df = document_frequency[word]
+                idf = math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+                self.postings[word].append((sentence_id, idf * tf * (k1 + 1) / (tf + norm)))
+
+    def search(self, words, k=3):
+        """Return up to k (sentence_id, score) pairs, best first"""
+        scores = defaultdict(float)
+        for word in set(words):
+            for sentence_id, weight in self.postings.get(word, ()):
+                scores[sentence_id] += weight
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+class Document:
+    """Source text analysed once and shared by every question-generation step
+
+    Sentences, their lowercased forms and word sets, and the entity lists
+    used for answers are computed on first use and then reused, so
+    generating many questions from one text does not re-tokenise it each
+    time.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._key_sentences = {}
+
+    @cached_property
+    def sentences(self):
+        return split_sentences(self.text)
+
+    @cached_property
+    def lowered(self):
+        return [sentence.lower() for sentence in self.sentences]
+
+    @cached_property
+    def index(self):
+        return SentenceIndex([WORD_PATTERN.findall(sentence) for sentence in self.lowered])
+
+    @cached_property
+    def words(self):
+        return self.text.split()
+
+    @cached_property
+    def proper_nouns(self):
+        return PROPER_NOUN_PATTERN.findall(self.text)
+
+    @cached_property
+    def dates(self):
+        return DATE_PATTERN.findall(self.text)
+
+    @cached_property
+    def locations(self):
+        return LOCATION_PATTERN.findall(self.text)
+
+    @cached_property
+    def distractor_engine(self):
+        from mlapp.ml.distractors import DistractorEngine
+        return DistractorEngine(self)
+
+    @cached_property
+    def sentence_scores(self):
+        """Importance heuristic per sentence, computed in a single pass"""
+        scores = []
+        for sentence, lowered in zip(self.sentences, self.lowered):
+            score = 0
+            # Longer sentences might contain more information
+            if len(sentence) > 10:
+                score += len(sentence) / 20
+            # Sentences with numbers often contain facts
+            if NUMBER_PATTERN.search(sentence):
+                score += 5
+            # Sentences with keywords might be important
+            score += 3 * len(set(KEYWORD_PATTERN.findall(lowered)))
+            scores.append(score)
+        return scores
+
+    def key_sentences(self, max_sentences=10):
+        if max_sentences not in self._key_sentences:
+            ranked = sorted(zip(self.sentences, self.sentence_scores), key=lambda x: x[1], reverse=True)
+            self._key_sentences[max_sentences] = [sentence for sentence, _ in ranked[:max_sentences]]
+        return self._key_sentences[max_sentences]
+
+    def relevant_passages(self, question, k=3):
+        """Up to k sentences ranked by BM25 relevance to the question"""
+        hits = self.index.search(WORD_PATTERN.findall(question.lower()), k)
+        return [self.sentences[sentence_id] for sentence_id, _ in hits]
+
+    def relevant_context(self, question):
+        """The single most relevant sentence for the question"""
+        passages = self.relevant_passages(question, k=1)
+        if passages:
+            return passages[0]
+        return self.sentences[0] if self.sentences else self.text[:100]
+
+
+def as_document(text):
+    return text if isinstance(text, Document) else Document(text)
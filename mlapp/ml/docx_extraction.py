@@ -1,18 +1,19 @@
 # mlapp/ml/docx_processor.py
 import os
 from docx import Document
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.conf import settings
 import uuid
 
-def extract_text_from_docx(docx_file, output_file=None):
+from mlapp.ml.uploads import open_upload
+
+def extract_text_from_docx(docx_file, output_file=None, scratch=None):
     """
     Extract text from a DOCX file and save it to a text file.
     
     Args:
         docx_file: Can be either a file path string or a Django UploadedFile object
         output_file: Path where the extracted text will be saved. If None, a default path will be generated.
+        scratch: Optional ScratchSpace for uploads that need a file on disk.
     
     Returns:
         str: Path to the saved text file
@@ -27,45 +28,18 @@ def extract_text_from_docx(docx_file, output_file=None):
         filename = f"docx_extract_{uuid.uuid4().hex}.txt"
         output_file = os.path.join(extract_dir, filename)
     
-    # If input is a Django UploadedFile or InMemoryUploadedFile
-    if hasattr(docx_file, 'read'):
-        # Save the uploaded file temporarily
-        temp_path = default_storage.save('mlapp/temp_docs/temp.docx', ContentFile(docx_file.read()))
-        try:
-            # Reset file pointer for future use
-            docx_file.seek(0)
-            # Open the document from the temp file
-            doc = Document(default_storage.path(temp_path))
-            text = ""
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-            
-            # Write extracted text to file
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(text)
-            
-            return output_file
-        finally:
-            # Clean up the temp file
-            if default_storage.exists(temp_path):
-                default_storage.delete(temp_path)
+    # Parse straight from the path, Django's temp file or the in-memory
+    # upload; python-docx only needs a seekable stream
+    with open_upload(docx_file, scratch) as stream:
+        doc = Document(stream)
     
-    # If input is a file path
-    else:
-        # Assume docx_file is a path string
-        if not os.path.exists(docx_file):
-            raise FileNotFoundError(f"File not found: {docx_file}")
-        
-        doc = Document(docx_file)
-        text = ""
+    # Write extracted text to file
+    with open(output_file, 'w', encoding='utf-8') as f:
         for para in doc.paragraphs:
-            text += para.text + "\n"
-        
-        # Write extracted text to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(text)
-        
-        return output_file
+            f.write(para.text)
+            f.write("\n")
+    
+    return output_file
 
 
 # -------------------------------------------------------------------------
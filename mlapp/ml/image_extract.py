@@ -2,17 +2,18 @@
 import os
 import uuid
 from google.cloud import vision
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.conf import settings
 
-def extract_text_from_image(image_file, output_file=None):
+from mlapp.ml.uploads import open_upload
+
+def extract_text_from_image(image_file, output_file=None, scratch=None):
     """
     Extract text from an image using Google Cloud Vision API and save to a text file.
     
     Args:
         image_file: Can be either a file path string or a Django UploadedFile object
         output_file: Path where the extracted text will be saved. If None, a default path will be generated.
+        scratch: Optional ScratchSpace for uploads that need a file on disk.
     
     Returns:
         str: Path to the saved text file
@@ -34,66 +35,27 @@ def extract_text_from_image(image_file, output_file=None):
     
     client = vision.ImageAnnotatorClient()
     
-    # If input is a Django UploadedFile or InMemoryUploadedFile
-    if hasattr(image_file, 'read'):
-        # Save the uploaded file temporarily
-        temp_path = default_storage.save('mlapp/temp_images/temp_image.jpg', ContentFile(image_file.read()))
-        try:
-            # Reset file pointer for future use
-            image_file.seek(0)
-            
-            # Read the image content
-            with open(default_storage.path(temp_path), "rb") as image_file_content:
-                content = image_file_content.read()
-                
-            # Process with Vision API
-            image = vision.Image(content=content)
-            response = client.text_detection(image=image)
-            
-            # Extract text from the response
-            if response.error.message:
-                raise Exception(f"Google Vision API error: {response.error.message}")
-                
-            # Get the extracted text or empty string if none
-            extracted_text = response.text_annotations[0].description if response.text_annotations else ""
-            
-            # Write extracted text to file
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(extracted_text)
-            
-            return output_file
-            
-        finally:
-            # Clean up the temp file
-            if default_storage.exists(temp_path):
-                default_storage.delete(temp_path)
+    # Read the image bytes once, straight from the path, Django's temp file
+    # or the in-memory upload (the Vision API needs them as bytes)
+    with open_upload(image_file, scratch) as stream:
+        content = stream.read()
     
-    # If input is a file path
-    else:
-        # Assume image_file is a path string
-        if not os.path.exists(image_file):
-            raise FileNotFoundError(f"File not found: {image_file}")
-        
-        # Open the image file
-        with open(image_file, "rb") as image_file_content:
-            content = image_file_content.read()
-            
-        # Process with Vision API
-        image = vision.Image(content=content)
-        response = client.text_detection(image=image)
-        
-        # Extract text from the response
-        if response.error.message:
-            raise Exception(f"Google Vision API error: {response.error.message}")
-            
-        # Get the extracted text or empty string if none
-        extracted_text = response.text_annotations[0].description if response.text_annotations else ""
-        
-        # Write extracted text to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(extracted_text)
+    # Process with Vision API
+    image = vision.Image(content=content)
+    response = client.text_detection(image=image)
+    
+    # Extract text from the response
+    if response.error.message:
+        raise Exception(f"Google Vision API error: {response.error.message}")
         
-        return output_file
+    # Get the extracted text or empty string if none
+    extracted_text = response.text_annotations[0].description if response.text_annotations else ""
+    
+    # Write extracted text to file
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(extracted_text)
+    
+    return output_file
 
 
 # -------------------------------------------------------------------------
@@ -193,4 +155,5 @@ def external_app_process(request):
 GOOGLE_APPLICATION_CREDENTIALS = os.path.join(BASE_DIR, 'path/to/your/google-credentials.json')
 
 # Or use environment variables in .env file:
-# GOOGLE_APPLICATION_CREDENTIALS=path/to/your/google-credentials.json
\ No newline at end of file
+# GOOGLE_APPLICATION_CREDENTIALS=path/to/your/google-credentials.json
+"""
@@ -0,0 +1,111 @@
+# mlapp/ml/ingestion.py
+import os
+import re
+from importlib import import_module
+
+# File extension -> (module, function). Extractors are imported on first use,
+# so a worker only needs the parsing library for the file types it sees.
+# Every extractor is called as extract(path, output_file).
+EXTRACTORS = {
+    '.pdf': ('mlapp.ml.pdf_extraction', 'extract_text_from_pdf'),
+    '.docx': ('mlapp.ml.docx_extraction', 'extract_text_from_docx'),
+    '.pptx': ('mlapp.ml.ppt_extracted', 'extract_text_from_ppt'),
+    '.jpg': ('mlapp.ml.image_extract', 'extract_text_from_image'),
+    '.jpeg': ('mlapp.ml.image_extract', 'extract_text_from_image'),
+    '.png': ('mlapp.ml.image_extract', 'extract_text_from_image'),
+    '.gif': ('mlapp.ml.image_extract', 'extract_text_from_image'),
+    '.bmp': ('mlapp.ml.image_extract', 'extract_text_from_image'),
+    '.webp': ('mlapp.ml.image_extract', 'extract_text_from_image'),
+    '.tif': ('mlapp.ml.image_extract', 'extract_text_from_image'),
+    '.tiff': ('mlapp.ml.image_extract', 'extract_text_from_image'),
+}
+
+# Extra keyword arguments for some extractors. PDFs are extracted serially:
+# ingestion runs in Celery prefork workers, which are daemonic (no process
+# pools) and already one per core.
+EXTRACTOR_OPTIONS = {
+    '.pdf': {'workers': 1},
+}
+
+CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# Bare page numbers and the slide markers extract_text_from_ppt adds
+NOISE_LINE_PATTERN = re.compile(r'^(?:\d+|--- Slide \d+ ---)$')
+
+class UnsupportedDocumentType(ValueError):
+    """Raised for files no extractor handles"""
+
+def document_type(filename):
+    """
+    The lower-cased extension of filename, if an extractor handles it.
+
+    Raises:
+        UnsupportedDocumentType: If no extractor handles the extension
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in EXTRACTORS:
+        supported = ", ".join(sorted(EXTRACTORS))
+        raise UnsupportedDocumentType(f"Unsupported file type '{extension}'. Supported: {supported}")
+    return extension
+
+def extract_document(path, output_file, name=None):
+    """
+    Extract the text of any supported document to output_file.
+
+    Args:
+        path: Path of the document on disk
+        output_file: Path where the extracted text will be saved
+        name: Original file name, used for the type when path has no extension
+
+    Returns:
+        str: Path to the saved text file
+    """
+    extension = document_type(name or path)
+    module_name, function_name = EXTRACTORS[extension]
+    extract = getattr(import_module(module_name), function_name)
+    extract(path, output_file, **EXTRACTOR_OPTIONS.get(extension, {}))
+    return output_file
+
+def iter_clean_paragraphs(lines):
+    """
+    Yield cleaned paragraphs from the lines of an extracted text file.
+
+    Control characters are dropped and runs of whitespace collapsed, page
+    numbers and slide markers removed, lines inside a paragraph joined, and
+    words hyphenated across a line break put back together. Works on one
+    paragraph at a time, so any length of file is fine.
+    """
+    paragraph = []
+    for line in lines:
+        line = WHITESPACE_PATTERN.sub(' ', CONTROL_CHARS_PATTERN.sub('', line)).strip()
+        if NOISE_LINE_PATTERN.match(line):
+            continue
+        if not line:
+            if paragraph:
+                yield ''.join(paragraph)
+                paragraph = []
+            continue
+        if paragraph:
+            if paragraph[-1].endswith('-') and line[:1].islower():
+                paragraph[-1] = paragraph[-1][:-1]
+            else:
+                paragraph.append(' ')
+        paragraph.append(line)
+    if paragraph:
+        yield ''.join(paragraph)
+
+def clean_text_file(source, destination):
+    """
+    Clean an extracted text file into destination, one paragraph per line.
+
+    Returns:
+        int: Number of paragraphs written
+    """
+    count = 0
+    with open(source, encoding='utf-8', errors='replace') as src, \
+            open(destination, 'w', encoding='utf-8') as dst:
+        for paragraph in iter_clean_paragraphs(src):
+            dst.write(paragraph)
+            dst.write("\n\n")
+            count += 1
+    return count
@@ -1,9 +1,13 @@
+import os
 import torch
 from transformers import T5ForConditionalGeneration, T5Tokenizer
 import random
 import nltk
 import re
 import json
+import threading
+from collections import deque
+from itertools import islice
 
 # Ensure NLTK data is downloaded properly
 try:
@@ -12,59 +16,139 @@ except LookupError:
     print("Downloading NLTK punkt tokenizer...")
     nltk.download('punkt')
 
-from nltk.tokenize import sent_tokenize
-
-def initialize_question_generator():
+from mlapp.ml.batch_inference import BatchGenerator
+from mlapp.ml.document import (
+    PROPER_NOUN_PATTERN,
+    WHOLE_NUMBER_PATTERN,
+    YEAR_PATTERN,
+    Document,
+    as_document,
+    iter_sentences,
+)
+from mlapp.ml.model_registry import registry
+from mlapp.ml.question_cache import cache_key, question_cache
+
+DEFAULT_MODEL_NAME = 't5-small'
+
+# Inference backend: 'pytorch' (fp32), 'quantized' (dynamic int8 Linear
+# layers) or 'onnx' (ONNX Runtime via optimum, exported once and cached)
+BACKENDS = ('pytorch', 'quantized', 'onnx')
+DEFAULT_BACKEND = os.environ.get('QUESTION_GENERATOR_BACKEND', 'pytorch')
+ONNX_CACHE_DIR = os.environ.get(
+    'QUESTION_GENERATOR_ONNX_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'quizmorph', 'onnx')
+)
+
+# Beam-search settings shared by the direct and batched generation paths
+GENERATION_KWARGS = {
+    'max_length': 64,
+    'num_beams': 10,
+    'no_repeat_ngram_size': 2,
+    'early_stopping': True,
+}
+
+# Token budget per window for long documents, leaving room for the task
+# prefix and end-of-sequence token within T5's 512-token input
+WINDOW_TOKENS = 500
+
+_batch_generators = {}
+_batch_generators_lock = threading.Lock()
+
+def initialize_question_generator(model_name=DEFAULT_MODEL_NAME, backend=None):
     """Initialize the T5 model and tokenizer"""
-    print("Loading T5 model and tokenizer...")
-    tokenizer = T5Tokenizer.from_pretrained('t5-small')
-    model = T5ForConditionalGeneration.from_pretrained('t5-small')
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+    print(f"Loading T5 model and tokenizer ({backend})...")
+    tokenizer = T5Tokenizer.from_pretrained(model_name)
+
+    if backend == 'onnx':
+        model = load_onnx_model(model_name)
+    else:
+        model = T5ForConditionalGeneration.from_pretrained(model_name)
+        model.eval()
+        if backend == 'quantized':
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    # Read by model_cache_id: an int8 model keeps the fp32 class and name_or_path
+    model.question_generator_backend = backend
     print("Model loaded successfully!")
     return model, tokenizer
 
-def extract_key_sentences(text, max_sentences=10):
-    """Extract important sentences from text"""
-    # Handle potential tokenization errors
+def load_onnx_model(model_name):
+    """ONNX Runtime seq2seq model with a KV-cached decoder, exported on first use"""
     try:
-        sentences = sent_tokenize(text)
-    except Exception as e:
-        print(f"Error tokenizing text: {e}")
-        # Fallback to simple splitting by periods
-        sentences = [s.strip() + '.' for s in text.split('.') if s.strip()]
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as exc:
+        raise ImportError(
+            "The 'onnx' backend needs optimum[onnxruntime]: pip install 'optimum[onnxruntime]'"
+        ) from exc
+
+    export_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace('/', '__'))
+    if os.path.isdir(export_dir):
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True)
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+    model.save_pretrained(export_dir)
+    return model
+
+def get_question_generator(model_name=DEFAULT_MODEL_NAME, backend=None):
+    """Shared (model, tokenizer) pair, loaded once per process"""
+    backend = backend or DEFAULT_BACKEND
+    name = f"{model_name}:{backend}"
+    if name not in registry:
+        registry.register(name, lambda: initialize_question_generator(model_name, backend))
+    return registry.get(name)
+
+def get_batch_generator(model_name=DEFAULT_MODEL_NAME, backend=None, max_batch_size=8, max_wait=0.05):
+    """Shared micro-batching generator, so concurrent requests share generate() calls"""
+    backend = backend or DEFAULT_BACKEND
+    name = f"{model_name}:{backend}"
+    with _batch_generators_lock:
+        if name not in _batch_generators:
+            _batch_generators[name] = BatchGenerator(
+                lambda: get_question_generator(model_name, backend),
+                max_batch_size=max_batch_size,
+                max_wait=max_wait,
+                **GENERATION_KWARGS
+            )
+        return _batch_generators[name]
 
+def extract_key_sentences(text, max_sentences=10):
+    """Extract important sentences from text (or an already analysed Document)"""
     # For a hackathon, we'll use a simple heuristic to identify important sentences
     # Sentences with numbers, technical terms, or longer than average might be important
-    scored_sentences = []
-    for sentence in sentences:
-        score = 0
-        # Longer sentences might contain more information
-        if len(sentence) > 10:
-            score += len(sentence) / 20
-
-        # Sentences with numbers often contain facts
-        if re.search(r'\d+', sentence):
-            score += 5
-
-        # Sentences with keywords might be important
-        keywords = ['important', 'significant', 'key', 'main', 'critical', 'essential']
-        for keyword in keywords:
-            if keyword in sentence.lower():
-                score += 3
-
-        scored_sentences.append((sentence, score))
-
-    # Sort by score and take top sentences
-    important_sentences = [s[0] for s in sorted(scored_sentences, key=lambda x: x[1], reverse=True)[:max_sentences]]
-    return important_sentences
-
-def generate_questions_with_t5(text, model=None, tokenizer=None, num_questions=5):
-    """Generate questions from text using T5 model"""
-    # Initialize model and tokenizer if not provided
+    return as_document(text).key_sentences(max_sentences)
+
+def model_cache_id(model):
+    """Name plus backend of a model, so fp32, int8 and ONNX results are cached apart"""
+    backend = getattr(model, 'question_generator_backend', None)
+    if backend is None:
+        # A model the caller loaded or quantized themselves
+        modules = model.modules() if hasattr(model, 'modules') else ()
+        quantized = any('quantized' in type(module).__module__ for module in modules)
+        backend = f"{type(model).__name__}{':quantized' if quantized else ''}"
+    return f"{getattr(model.config, 'name_or_path', 'custom')}:{backend}"
+
+def generate_questions_with_t5(text, model=None, tokenizer=None, num_questions=5, use_cache=True):
+    """Generate questions from text using T5 model (cached by content hash)"""
     if model is None or tokenizer is None:
-        model, tokenizer = initialize_question_generator()
+        model_id = f"{DEFAULT_MODEL_NAME}:{DEFAULT_BACKEND}"
+    else:
+        model_id = model_cache_id(model)
+    generate = lambda: _generate_questions_with_t5(text, model, tokenizer, num_questions)
+    if not use_cache:
+        return generate()
+
+    key = cache_key(text, 't5', model=model_id, num_questions=num_questions, beams=GENERATION_KWARGS['num_beams'])
+    return question_cache.get_or_generate(key, generate)
+
+def _generate_questions_with_t5(text, model, tokenizer, num_questions):
+    # Analyse the text once; extraction, answers and context all reuse it
+    doc = Document(text)
 
     # Extract important sentences to focus on
-    key_sentences = extract_key_sentences(text)
+    key_sentences = doc.key_sentences()
     combined_text = " ".join(key_sentences)
 
     # Prepare input for question generation
@@ -72,39 +156,46 @@ def generate_questions_with_t5(text, model=None, tokenizer=None, num_questions=5
 
     print(f"Generating questions from text (length: {len(input_text)} chars)...")
 
-    # Tokenize input
-    input_ids = tokenizer.encode(input_text, return_tensors="pt", max_length=512, truncation=True)
-
-    # Generate questions
-    outputs = model.generate(
-        input_ids=input_ids,
-        max_length=64,
-        num_beams=10,
-        no_repeat_ngram_size=2,
-        num_return_sequences=min(num_questions * 2, 10),  # Generate extra for filtering
-        early_stopping=True
-    )
-
-    # Decode questions
-    generated_questions = []
-    for output in outputs:
-        question_text = tokenizer.decode(output, skip_special_tokens=True)
-        # Add to list if it ends with a question mark
-        if '?' in question_text:
-            generated_questions.append(question_text)
+    num_return_sequences = min(num_questions * 2, 10)  # Generate extra for filtering
+    if model is None or tokenizer is None:
+        # Shared model; batched with other requests arriving at the same time
+        decoded = get_batch_generator().generate(input_text, num_return_sequences)
+    else:
+        # Tokenize input
+        input_ids = tokenizer.encode(input_text, return_tensors="pt", max_length=512, truncation=True)
+
+        # Generate questions
+        outputs = model.generate(
+            input_ids=input_ids,
+            num_return_sequences=num_return_sequences,
+            **GENERATION_KWARGS
+        )
+        decoded = [tokenizer.decode(output, skip_special_tokens=True) for output in outputs]
+
+    # Keep the outputs that are actually questions
+    generated_questions = [question_text for question_text in decoded if '?' in question_text]
 
     # For a hackathon, let's add a simple way to generate answers and options
-    processed_questions = []
-    for question in generated_questions[:num_questions]:
-        # Generate a simple answer (in a real app, you'd use a QA model for this)
-        answer = generate_simple_answer(question, text)
-
-        # Generate options for MCQs
-        options = [answer]
-        for _ in range(3):  # Generate 3 distractors
-            distractor = generate_distractor(answer, text)
-            if distractor and distractor not in options:
-                options.append(distractor)
+    processed_questions = build_mcqs(generated_questions[:num_questions], doc)
+
+    # Generate some true/false questions too
+    tf_questions = generate_true_false_questions(key_sentences, num_questions // 2)
+
+    return processed_questions[:num_questions] + tf_questions
+
+def build_mcqs(questions, text):
+    """Turn generated questions into MCQs with answers, distractors and source context"""
+    doc = as_document(text)
+
+    # Generate simple answers (in a real app, you'd use a QA model for this)
+    answers = [generate_simple_answer(question, doc) for question in questions]
+
+    # Pick 3 distractors for every answer in one batched similarity call
+    distractor_lists = doc.distractor_engine.pick(answers, 3)
+
+    mcqs = []
+    for question, answer, distractors in zip(questions, answers, distractor_lists):
+        options = [answer] + distractors
 
         # Fill in with generic options if needed
         while len(options) < 4:
@@ -113,44 +204,184 @@ def generate_questions_with_t5(text, model=None, tokenizer=None, num_questions=5
         # Shuffle options
         random.shuffle(options)
 
-        processed_questions.append({
+        passages = get_relevant_passages(question, doc)
+
+        mcqs.append({
             'type': 'mcq',
             'question': question,
             'options': options,
             'correct_answer': answer,
-            'source_text': get_relevant_context(question, text)
+            'source_text': passages[0] if passages else get_relevant_context(question, doc),
+            'source_passages': passages
         })
+    return mcqs
 
-    # Generate some true/false questions too
-    tf_questions = generate_true_false_questions(key_sentences, num_questions // 2)
+def split_into_windows(text, tokenizer, window_tokens=WINDOW_TOKENS):
+    """Pack whole sentences into windows of at most window_tokens tokens each"""
+    sentences = as_document(text).sentences
+    # One tokenizer call for the whole document rather than one per sentence
+    return list(iter_windows(sentences, tokenizer, window_tokens, tokenize_batch=len(sentences) or 1))
 
-    return processed_questions[:num_questions] + tf_questions
+def iter_windows(sentences, tokenizer, window_tokens=WINDOW_TOKENS, tokenize_batch=256):
+    """Lazily pack a stream of sentences into windows of at most window_tokens tokens
+
+    Sentences are tokenized tokenize_batch at a time, so a long document is
+    never tokenized (or held) all at once.
+    """
+    sentences = iter(sentences)
+    current, current_tokens = [], 0
+    while True:
+        batch = list(islice(sentences, tokenize_batch))
+        if not batch:
+            break
+        lengths = [len(ids) for ids in tokenizer(batch, add_special_tokens=False)['input_ids']]
+        for sentence, length in zip(batch, lengths):
+            if current and current_tokens + length > window_tokens:
+                yield " ".join(current)
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += length
+    if current:
+        yield " ".join(current)
+
+def normalize_question(question):
+    """Key used to spot the same question generated from different windows"""
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', '', question.lower())).strip()
+
+def generate_questions_from_document(text, questions_per_window=2, max_questions=None,
+                                     window_tokens=WINDOW_TOKENS, model_name=DEFAULT_MODEL_NAME, use_cache=True):
+    """Generate questions from a whole document rather than its first 512 tokens
+
+    The text is split into token-budgeted windows and every window is sent
+    to the shared batch generator at once, so windows run through the model
+    together in padded batches (torch spreads each batch across the CPU
+    cores). The number of questions grows with the length of the document.
+    Duplicates across windows are dropped, and questions are interleaved
+    window by window so a max_questions cut still covers the whole document.
+    Results are cached by content hash.
+    """
+    generate = lambda: _generate_questions_from_document(
+        text, questions_per_window, max_questions, window_tokens, model_name
+    )
+    if not use_cache:
+        return generate()
+
+    key = cache_key(
+        text, 't5-document', model=f"{model_name}:{DEFAULT_BACKEND}", beams=GENERATION_KWARGS['num_beams'],
+        questions_per_window=questions_per_window, max_questions=max_questions, window_tokens=window_tokens,
+    )
+    return question_cache.get_or_generate(key, generate)
+
+def _generate_questions_from_document(text, questions_per_window, max_questions, window_tokens, model_name):
+    _, tokenizer = get_question_generator(model_name)
+    windows = split_into_windows(text, tokenizer, window_tokens)
+    if not windows:
+        return []
+
+    print(f"Generating questions from {len(windows)} windows...")
+
+    batcher = get_batch_generator(model_name)
+    num_return_sequences = min(questions_per_window * 2, 10)  # Generate extra for filtering
+    futures = [batcher.submit(f"generate questions: {window}", num_return_sequences) for window in windows]
+
+    per_window = []
+    seen = set()
+    for window, future in zip(windows, futures):
+        questions = []
+        for question in future.result():
+            key = normalize_question(question)
+            if '?' in question and key not in seen:
+                seen.add(key)
+                questions.append(question)
+            if len(questions) == questions_per_window:
+                break
+        per_window.append((window, questions))
+
+    # Round-robin across windows so every part of the document is represented
+    ordered = []
+    for rank in range(questions_per_window):
+        for window, questions in per_window:
+            if rank < len(questions):
+                ordered.append((window, questions[rank]))
+    if max_questions is not None:
+        ordered = ordered[:max_questions]
+
+    # Answers, distractors and context come from the question's own window
+    window_docs = {window: Document(window) for window, _ in per_window}
+    by_window = {}
+    for window, question in ordered:
+        by_window.setdefault(window, []).append(question)
+    built = {window: iter(build_mcqs(questions, window_docs[window])) for window, questions in by_window.items()}
+    mcqs = [next(built[window]) for window, _ in ordered]
+
+    key_sentences = [window_docs[window].key_sentences(1)[0] for window, _ in per_window]
+    tf_questions = generate_true_false_questions(key_sentences, len(mcqs) // 2)
+
+    return mcqs + tf_questions
+
+def stream_questions_from_pages(pages, questions_per_window=2, window_tokens=WINDOW_TOKENS,
+                                model_name=DEFAULT_MODEL_NAME, max_in_flight=8):
+    """Yield MCQs window by window from a stream of page texts
+
+    The streaming counterpart of generate_questions_from_document for large
+    files: pages (e.g. from pdf_extraction.iter_pdf_pages) are split into
+    sentences and windows as they arrive, at most max_in_flight windows are
+    queued on the batch generator at once, and each window's questions are
+    yielded as soon as they are built. Memory stays flat however long the
+    document is. Questions come out in document order, duplicates across
+    windows are dropped, and results are not cached since the full text is
+    never seen.
+    """
+    _, tokenizer = get_question_generator(model_name)
+    batcher = get_batch_generator(model_name)
+    num_return_sequences = min(questions_per_window * 2, 10)  # Generate extra for filtering
+
+    seen = set()
+    in_flight = deque()
+
+    def drain_one():
+        window, future = in_flight.popleft()
+        questions = []
+        for question in future.result():
+            key = normalize_question(question)
+            if '?' in question and key not in seen:
+                seen.add(key)
+                questions.append(question)
+            if len(questions) == questions_per_window:
+                break
+        return build_mcqs(questions, Document(window)) if questions else []
+
+    for window in iter_windows(iter_sentences(pages), tokenizer, window_tokens):
+        in_flight.append((window, batcher.submit(f"generate questions: {window}", num_return_sequences)))
+        if len(in_flight) >= max_in_flight:
+            yield from drain_one()
+    while in_flight:
+        yield from drain_one()
 
 def generate_simple_answer(question, text):
     """Generate a simple answer based on the question and text
     This is a simplified approach for the hackathon"""
+    doc = as_document(text)
+    question_lower = question.lower()
 
     # Extract potential answer entities based on question type
-    if "who" in question.lower():
+    if "who" in question_lower:
         # Look for proper nouns as answer candidates
-        proper_nouns = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        if proper_nouns:
-            return random.choice(proper_nouns)
+        if doc.proper_nouns:
+            return random.choice(doc.proper_nouns)
 
-    elif "when" in question.lower():
+    elif "when" in question_lower:
         # Look for dates or years
-        dates = re.findall(r'\b\d{4}\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?,\s+\d{4}\b', text)
-        if dates:
-            return random.choice(dates)
+        if doc.dates:
+            return random.choice(doc.dates)
 
-    elif "where" in question.lower():
+    elif "where" in question_lower:
         # Look for locations (simplified)
-        locations = re.findall(r'\b[A-Z][a-z]+(?:,\s+[A-Z][a-z]+)?\b', text)
-        if locations:
-            return random.choice(locations)
+        if doc.locations:
+            return random.choice(doc.locations)
 
     # Default approach: extract a key phrase
-    words = text.split()
+    words = doc.words
     if len(words) > 5:
         start = random.randint(0, len(words) - 5)
         return " ".join(words[start:start+random.randint(1, 3)])
@@ -159,8 +390,13 @@ def generate_simple_answer(question, text):
 
 def generate_distractor(answer, text):
     """Generate a plausible but incorrect option"""
-    # Simple approach: get a different phrase from the text
-    words = text.split()
+    doc = as_document(text)
+    picks = doc.distractor_engine.pick([answer], 1)[0]
+    if picks:
+        return picks[0]
+
+    # Otherwise get a different phrase from the text
+    words = doc.words
     if len(words) > 5:
         start = random.randint(0, len(words) - 5)
         distractor = " ".join(words[start:start+random.randint(1, 3)])
@@ -178,27 +414,11 @@ def generate_distractor(answer, text):
 
 def get_relevant_context(question, text):
     """Find the most relevant section of text for a question"""
-    try:
-        sentences = sent_tokenize(text)
-    except Exception:
-        # Fallback to simple splitting
-        sentences = [s.strip() + '.' for s in text.split('.') if s.strip()]
-
-    # Simple approach: find sentences with words from the question
-    question_words = set(re.findall(r'\b\w+\b', question.lower()))
-
-    best_sentence = ""
-    best_score = 0
+    return as_document(text).relevant_context(question)
 
-    for sentence in sentences:
-        sentence_words = set(re.findall(r'\b\w+\b', sentence.lower()))
-        # Count matching words
-        score = len(question_words.intersection(sentence_words))
-        if score > best_score:
-            best_score = score
-            best_sentence = sentence
-
-    return best_sentence if best_score > 0 else sentences[0] if sentences else text[:100]
+def get_relevant_passages(question, text, k=3):
+    """Top-k passages for a question, most relevant first"""
+    return as_document(text).relevant_passages(question, k)
 
 def generate_true_false_questions(sentences, num_questions=3):
     """Generate true/false questions from sentences"""
@@ -239,7 +459,8 @@ def modify_sentence_for_false(sentence):
     # Simple approach for hackathon: negate the sentence or change numbers
 
     # Try to negate the sentence
-    if " not " not in sentence.lower() and " no " not in sentence.lower():
+    lowered = sentence.lower()
+    if " not " not in lowered and " no " not in lowered:
         words = sentence.split()
         for i, word in enumerate(words):
             if word.lower() in ['is', 'are', 'was', 'were', 'has', 'have', 'had', 'can', 'will']:
@@ -247,28 +468,32 @@ def modify_sentence_for_false(sentence):
                 return " ".join(words)
 
     # Change numbers if present
-    numbers = re.findall(r'\b\d+\b', sentence)
+    numbers = WHOLE_NUMBER_PATTERN.findall(sentence)
     if numbers:
         number = random.choice(numbers)
         new_number = str(int(number) + random.randint(1, 10))
         return sentence.replace(number, new_number)
 
     # Add "not" somewhere as a fallback
-    return "It is not true that " + sentence.lower()
+    return "It is not true that " + lowered
 
 # Simple question generator - alternative approach
-def simple_question_generator(text, num_questions=5):
-    """A simpler question generator that doesn't require T5"""
+def simple_question_generator(text, num_questions=5, use_cache=True):
+    """A simpler question generator that doesn't require T5 (cached by content hash)"""
+    generate = lambda: _simple_question_generator(text, num_questions)
+    if not use_cache:
+        return generate()
+
+    key = cache_key(text, 'simple', num_questions=num_questions)
+    return question_cache.get_or_generate(key, generate)
+
+def _simple_question_generator(text, num_questions):
     print("Using simple question generator instead of T5...")
 
-    try:
-        sentences = sent_tokenize(text)
-    except Exception:
-        # Fallback to simple splitting
-        sentences = [s.strip() + '.' for s in text.split('.') if s.strip()]
+    doc = Document(text)
 
     # Get important sentences
-    key_sentences = extract_key_sentences(text)
+    key_sentences = doc.key_sentences()
 
     questions = []
 
@@ -278,9 +503,9 @@ def simple_question_generator(text, num_questions=5):
             break
 
         # Try to find a key entity to ask about
-        entities = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', sentence)
-        dates = re.findall(r'\b\d{4}\b', sentence)
-        numbers = re.findall(r'\b\d+\b', sentence)
+        entities = PROPER_NOUN_PATTERN.findall(sentence)
+        dates = YEAR_PATTERN.findall(sentence)
+        numbers = WHOLE_NUMBER_PATTERN.findall(sentence)
 
         if entities:
             entity = random.choice(entities)
@@ -291,7 +516,7 @@ def simple_question_generator(text, num_questions=5):
             options = [entity]
             # Add some other entities as distractors
             other_entities = [e for e in entities if e != entity]
-            other_entities.extend([e for e in re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text) if e not in entities])
+            other_entities.extend([e for e in doc.proper_nouns if e not in entities])
 
             # Get unique distractors
             for e in other_entities[:3]:
@@ -361,7 +586,7 @@ def run_with_fallback():
 
     try:
         # Try to use T5
-        model, tokenizer = initialize_question_generator()
+        model, tokenizer = get_question_generator()
         questions = generate_questions_with_t5(lists, model, tokenizer, 5)  # Fixed: changed 'lists' to 'sample_text'
     except Exception as e:
         print(f"Error using T5 model: {e}")
@@ -398,7 +623,7 @@ def run_example():
 
     try:
         # Try with T5 approach
-        model, tokenizer = initialize_question_generator()
+        model, tokenizer = get_question_generator()
         mcqs = generate_questions_with_t5(lists, model, tokenizer, num_questions=5)
         
         # Print generated questions
@@ -439,7 +664,7 @@ if __name__ == "__main__":
         
 #         # Try using T5, with fallback to simple generator
 #         try:
-#             model, tokenizer = initialize_question_generator()
+#             model, tokenizer = get_question_generator()
 #             questions = generate_questions_with_t5(text, model, tokenizer, 5)
 #         except Exception:
 #             questions = simple_question_generator(text, 5)
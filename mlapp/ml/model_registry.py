@@ -0,0 +1,69 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded ML models.
+
+    Models are loaded lazily on first use and shared by every caller in the
+    process. Loading is guarded by a per-name lock so concurrent requests
+    never load the same model twice. If ``idle_timeout`` (seconds) is set,
+    models nobody has asked for within that window are dropped the next
+    time the registry is used, freeing their memory.
+    """
+
+    def __init__(self, idle_timeout=None):
+        self.idle_timeout = idle_timeout
+        self._loaders = {}
+        self._models = {}
+        self._last_used = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """Register a zero-argument callable that loads the model called ``name``"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def __contains__(self, name):
+        return name in self._loaders
+
+    def get(self, name):
+        """Return the loaded model, loading it on first use"""
+        self.evict_idle()
+        with self._lock:
+            if name not in self._loaders:
+                raise KeyError(f"No model registered as '{name}'")
+            lock = self._locks[name]
+
+        with lock:
+            if name not in self._models:
+                self._models[name] = self._loaders[name]()
+            self._last_used[name] = time.monotonic()
+            return self._models[name]
+
+    def warm_up(self, names=None):
+        """Load models ahead of the first request (e.g. when a worker starts)"""
+        for name in names or list(self._loaders):
+            self.get(name)
+
+    def evict(self, name):
+        with self._locks.get(name, self._lock):
+            self._models.pop(name, None)
+            self._last_used.pop(name, None)
+
+    def evict_idle(self):
+        if self.idle_timeout is None:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        for name, last_used in list(self._last_used.items()):
+            if last_used < cutoff:
+                self.evict(name)
+
+    def loaded(self):
+        return list(self._models)
+
+
+registry = ModelRegistry()
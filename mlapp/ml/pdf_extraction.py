@@ -1,18 +1,101 @@
 # mlapp/ml/pdf_processor.py
+import multiprocessing
 import os
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 import PyPDF2
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.conf import settings
 
-def extract_text_from_pdf(pdf_file, output_file=None):
+from mlapp.ml.uploads import open_upload, upload_path
+
+# Worker processes for page extraction. Parallel extraction is opt-in: the
+# default of 1 keeps everything in-process, which is what web processes and
+# Celery prefork workers (daemonic, and already one per core) need
+PDF_EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', 1))
+# PDFs shorter than this aren't worth the cost of starting a process pool
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 32))
+# Page ranges per worker; more, smaller ranges even out slow pages
+PDF_RANGES_PER_WORKER = 4
+
+def iter_pdf_pages(pdf_file, workers=None, scratch=None):
+    """
+    Yield the text of a PDF one page at a time, as each page is parsed.
+    
+    With more than one worker, long PDFs are split into page ranges that
+    are extracted in parallel by a process pool, each worker opening its
+    own reader on the same file. Pages are still yielded in order. Only ask
+    for workers from a standalone process (a script or management
+    command): daemonic processes such as Celery prefork children can't
+    start a pool, so there extraction always stays serial.
+    
+    Args:
+        pdf_file: Can be either a file path string or a Django UploadedFile object
+        workers: Number of worker processes. If None, PDF_EXTRACT_WORKERS is used.
+        scratch: Optional ScratchSpace. In-memory uploads are copied into it
+            so parallel workers have a file to open; without one they are
+            parsed serially from the stream.
+    
+    Yields:
+        str: The extracted text of each page, in order
+    """
+    # Paths and TemporaryUploadedFiles are read in place from disk
+    path = upload_path(pdf_file)
+    workers = PDF_EXTRACT_WORKERS if workers is None else workers
+    if multiprocessing.current_process().daemon:
+        workers = 1
+    if path is None and scratch is not None and workers > 1:
+        path = scratch.save(pdf_file, '.pdf')
+    if path is not None:
+        yield from _iter_pages(path, workers)
+    
+    # In-memory uploads are small (Django spills anything over
+    # FILE_UPLOAD_MAX_MEMORY_SIZE to a temp file), so parse them straight
+    # from the stream
+    else:
+        with open_upload(pdf_file, scratch) as stream:
+            for page in PyPDF2.PdfReader(stream).pages:
+                yield page.extract_text() or ""
+
+def _iter_pages(path, workers=None):
+    workers = PDF_EXTRACT_WORKERS if workers is None else workers
+    with open_upload(path) as stream:
+        reader = PyPDF2.PdfReader(stream)
+        page_count = len(reader.pages)
+        if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+            for page in reader.pages:
+                yield page.extract_text() or ""
+            return
+    
+    yield from _iter_pages_parallel(path, page_count, workers)
+
+def _iter_pages_parallel(path, page_count, workers):
+    range_size = -(-page_count // (workers * PDF_RANGES_PER_WORKER))
+    starts = range(0, page_count, range_size)
+    stops = [min(start + range_size, page_count) for start in starts]
+    with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as pool:
+        # map() hands back each range's pages in order as soon as that
+        # range and every one before it are done
+        for pages in pool.map(_extract_page_range, [path] * len(starts), starts, stops):
+            yield from pages
+
+def _extract_page_range(path, start, stop):
+    """Worker: extract pages [start, stop) with a reader of its own"""
+    with open_upload(path) as stream:
+        reader = PyPDF2.PdfReader(stream)
+        return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+def extract_text_from_pdf(pdf_file, output_file=None, workers=None, scratch=None):
     """
     Extract text from a PDF file and save it to a text file.
     
+    Pages are written to the output file as they are parsed, so memory use
+    stays flat however many pages the PDF has.
+    
     Args:
         pdf_file: Can be either a file path string or a Django UploadedFile object
         output_file: Path where the extracted text will be saved. If None, a default path will be generated.
+        workers: Number of worker processes for long PDFs. If None, PDF_EXTRACT_WORKERS is used.
+        scratch: Optional ScratchSpace for uploads that need a file on disk.
     
     Returns:
         str: Path to the saved text file
@@ -27,49 +110,19 @@ def extract_text_from_pdf(pdf_file, output_file=None):
         filename = f"pdf_extract_{uuid.uuid4().hex}.txt"
         output_file = os.path.join(extract_dir, filename)
     
-    # If input is a Django UploadedFile or InMemoryUploadedFile
-    if hasattr(pdf_file, 'read'):
-        # Save the uploaded file temporarily
-        temp_path = default_storage.save('mlapp/temp_pdfs/temp.pdf', ContentFile(pdf_file.read()))
-        try:
-            # Reset file pointer for future use
-            pdf_file.seek(0)
-            
-            # Extract text from the PDF
-            with open(default_storage.path(temp_path), "rb") as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n\n"  # Add page breaks for readability
-            
-            # Write extracted text to file
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(text)
-            
-            return output_file
-        finally:
-            # Clean up the temp file
-            if default_storage.exists(temp_path):
-                default_storage.delete(temp_path)
+    # Open the PDF first so a missing file doesn't leave an empty output behind
+    pages = iter_pdf_pages(pdf_file, workers, scratch)
+    first_page = next(pages, None)
     
-    # If input is a file path
-    else:
-        # Assume pdf_file is a path string
-        if not os.path.exists(pdf_file):
-            raise FileNotFoundError(f"File not found: {pdf_file}")
-        
-        # Extract text from the PDF
-        with open(pdf_file, "rb") as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n\n"  # Add page breaks for readability
-        
-        # Write extracted text to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(text)
-        
-        return output_file
+    with open(output_file, 'w', encoding='utf-8') as f:
+        if first_page is not None:
+            f.write(first_page)
+            f.write("\n\n")  # Add page breaks for readability
+        for page_text in pages:
+            f.write(page_text)
+            f.write("\n\n")
+    
+    return output_file
 
 
 # -------------------------------------------------------------------------
@@ -166,7 +219,18 @@ def external_app_process(request):
 # from mlapp.ml import extract_text_from_pdf
 """
 
-# Example 5: Batch processing multiple PDFs
+# Example 5: Streaming a large PDF straight into question generation
+"""
+# Pages are parsed, sentence-split and sent to the model as they go, so a
+# 500-page textbook never has to be held in memory as one string:
+from mlapp.ml.mcq_generation import stream_questions_from_pages
+
+def questions_from_textbook(pdf_path):
+    for mcq in stream_questions_from_pages(iter_pdf_pages(pdf_path)):
+        yield mcq
+"""
+
+# Example 6: Batch processing multiple PDFs
 """
 # Process all PDFs in a directory:
 def batch_process_pdfs(directory_path, output_directory=None):
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+QUESTION_CACHE_TTL = int(os.environ.get('QUESTION_CACHE_TTL', 7 * 24 * 3600))
+QUESTION_CACHE_DIR = os.environ.get(
+    'QUESTION_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'quizmorph', 'questions')
+)
+QUESTION_CACHE_MAX_ENTRIES = int(os.environ.get('QUESTION_CACHE_MAX_ENTRIES', 1000))
+
+
+def normalize_text(text):
+    """Collapse whitespace so re-extracted copies of the same document hash the same"""
+    return " ".join(text.split())
+
+
+def cache_key(text, generator, **params):
+    """Hash of the normalised source text plus everything that changes the output"""
+    payload = json.dumps([normalize_text(text), generator, params], sort_keys=True)
+    return "questions:" + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _django_cache():
+    """The project's default cache (Redis) when running inside Django, else None"""
+    try:
+        from django.conf import settings
+        if not settings.configured:
+            return None
+        from django.core.cache import cache
+        return cache
+    except ImportError:
+        return None
+
+
+class DiskCache:
+    """
+    Small JSON-file cache with TTL and least-recently-used eviction.
+
+    Reads touch the file's mtime, so eviction drops the entries that were
+    read or written longest ago once there are more than max_entries.
+    Filesystem errors (an unwritable directory, an entry another process
+    evicted mid-read) are swallowed: a cache miss or a lost write is fine,
+    failing the caller that just generated the questions is not.
+    """
+
+    def __init__(self, directory=QUESTION_CACHE_DIR, ttl=QUESTION_CACHE_TTL, max_entries=QUESTION_CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def _path(self, key):
+        return os.path.join(self.directory, key.split(':', 1)[-1] + '.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            created, value = entry['created'], entry['value']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if time.time() - created > self.ttl:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by another process since the read; the value is still good
+        return value
+
+    def set(self, key, value):
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'created': time.time(), 'value': value}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+            tmp_path = None
+            self._evict()
+        except OSError as e:
+            print(f"Question cache write failed: {e}")
+            if tmp_path is not None:
+                self._remove(tmp_path)
+
+    def _evict(self):
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        if len(entries) <= self.max_entries:
+            return
+        mtimes = []
+        for entry in entries:
+            try:
+                mtimes.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue  # already evicted by another process
+        mtimes.sort()
+        for _, path in mtimes[:len(mtimes) - self.max_entries]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class QuestionCache:
+    """
+    Generated question sets keyed by content hash.
+
+    Uses the Django ``default`` cache (Redis, which applies the TTL and its
+    own eviction policy) and falls back to a local DiskCache whenever Django
+    is not configured or Redis is unreachable.
+    """
+
+    def __init__(self, ttl=QUESTION_CACHE_TTL):
+        self.ttl = ttl
+        self.disk = DiskCache(ttl=ttl)
+
+    def get(self, key):
+        cache = _django_cache()
+        if cache is not None:
+            try:
+                value = cache.get(key)
+                if value is not None:
+                    return value
+            except Exception:
+                pass
+        return self.disk.get(key)
+
+    def set(self, key, value):
+        cache = _django_cache()
+        if cache is not None:
+            try:
+                cache.set(key, value, timeout=self.ttl)
+                return
+            except Exception:
+                pass
+        self.disk.set(key, value)
+
+    def get_or_generate(self, key, generate):
+        value = self.get(key)
+        if value is None:
+            value = generate()
+            self.set(key, value)
+        return value
+
+
+question_cache = QuestionCache()
@@ -0,0 +1,102 @@
+# mlapp/ml/scratch.py
+import os
+import shutil
+import tempfile
+
+# Where scratch directories are created; None means the system temp dir
+SCRATCH_DIR = os.environ.get('MLAPP_SCRATCH_DIR') or None
+# Total bytes one scratch space may hold
+SCRATCH_MAX_BYTES = int(os.environ.get('MLAPP_SCRATCH_MAX_BYTES', 512 * 1024 * 1024))
+COPY_CHUNK_SIZE = 1024 * 1024
+
+class ScratchQuotaExceeded(Exception):
+    """Raised when a write would take a ScratchSpace over its size quota"""
+
+class ScratchSpace:
+    """
+    A private temp directory for one request or task.
+
+    Every file gets a unique name from tempfile, so concurrent uploads never
+    collide, and nothing goes through default_storage. Writes count against
+    max_bytes, and the whole directory is removed by cleanup() or on leaving
+    the with block.
+
+    Usage:
+        with ScratchSpace() as scratch:
+            extract_text_from_pdf(upload, scratch=scratch)
+    """
+
+    def __init__(self, max_bytes=SCRATCH_MAX_BYTES, root=SCRATCH_DIR):
+        self.max_bytes = max_bytes
+        self.root = root
+        self.used_bytes = 0
+        self._dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cleanup()
+
+    @property
+    def dir(self):
+        """The scratch directory, created on first use"""
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix='mlapp-', dir=self.root)
+        return self._dir
+
+    def path(self, suffix=''):
+        """Reserve a new, empty, uniquely named file and return its path"""
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.dir)
+        os.close(fd)
+        return path
+
+    def save(self, upload, suffix=None):
+        """
+        Copy an uploaded file or binary stream into the scratch space in chunks.
+
+        Args:
+            upload: A Django UploadedFile or any readable binary stream
+            suffix: File suffix; by default taken from the upload's name
+
+        Returns:
+            str: Path of the copy
+
+        Raises:
+            ScratchQuotaExceeded: If the copy would go over max_bytes; the
+                partial file is removed
+        """
+        if suffix is None:
+            suffix = os.path.splitext(getattr(upload, 'name', None) or '')[1]
+        if hasattr(upload, 'chunks'):
+            chunks = upload.chunks(COPY_CHUNK_SIZE)
+        else:
+            chunks = iter(lambda: upload.read(COPY_CHUNK_SIZE), b'')
+
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.dir)
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in chunks:
+                    self._reserve(len(chunk))
+                    written += len(chunk)
+                    file.write(chunk)
+        except BaseException:
+            self.used_bytes -= written
+            os.remove(path)
+            raise
+        return path
+
+    def cleanup(self):
+        """Remove the scratch directory and everything in it"""
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self.used_bytes = 0
+
+    def _reserve(self, size):
+        if self.used_bytes + size > self.max_bytes:
+            raise ScratchQuotaExceeded(
+                f"Scratch space quota of {self.max_bytes} bytes exceeded"
+            )
+        self.used_bytes += size
@@ -0,0 +1,107 @@
+from bisect import bisect_left, insort
+
+
+class SortedRanking:
+    """In-memory points ranking, kept in step with each progress update
+
+    Entries are held as a sorted list of (-points, student_id), so rank
+    lookups are a binary search and the top N are the first N entries.
+    Ties are broken by student id. An update is a binary search plus a
+    list insert and delete, which are O(n) memmoves of pointers: far
+    cheaper than the full re-sort they replace, but not O(log n).
+
+    The ranking lives in this process only. Writes other processes make
+    to a shared store show up after TeachBackSystem.reload_ranking();
+    use RedisRanking for a ranking that is always shared.
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._points = {}
+
+    def load(self, pairs):
+        """Replace the ranking with (student_id, points) pairs in one sort"""
+        self._points = dict(pairs)
+        self._entries = sorted((-points, student_id) for student_id, points in self._points.items())
+
+    def update(self, student_id, points):
+        old = self._points.get(student_id)
+        if old == points:
+            return
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (-old, student_id))]
+        insort(self._entries, (-points, student_id))
+        self._points[student_id] = points
+
+    def remove(self, student_id):
+        old = self._points.pop(student_id, None)
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (-old, student_id))]
+
+    def top(self, n=10):
+        """Return [(student_id, points)] for the n highest-scoring students"""
+        return [(student_id, -points) for points, student_id in self._entries[:n]]
+
+    def rank(self, student_id):
+        """1-based rank, or None for an unknown student"""
+        points = self._points.get(student_id)
+        if points is None:
+            return None
+        return bisect_left(self._entries, (-points, student_id)) + 1
+
+
+class RedisRanking:
+    """The same ranking as a Redis sorted set, like the live quiz leaderboard
+
+    Use this when several processes serve teach-back sessions and need
+    one shared ranking. ``client`` is a redis.Redis with
+    decode_responses=True.
+    """
+
+    def __init__(self, client, key="teachback:points", batch_size=5000):
+        self.client = client
+        self.key = key
+        self.batch_size = batch_size
+
+    def load(self, pairs):
+        """Replace the ranking with (student_id, points) pairs
+
+        The pairs are written to a staging key in pipelined batches and then
+        renamed over the live key, so students no longer in the store drop
+        out and readers never see a half-loaded ranking.
+        """
+        staging_key = f"{self.key}:loading"
+        pipe = self.client.pipeline(transaction=False)
+        pipe.delete(staging_key)
+        batch, loaded = {}, 0
+        for student_id, points in pairs:
+            batch[student_id] = points
+            loaded += 1
+            if len(batch) == self.batch_size:
+                pipe.zadd(staging_key, batch)
+                batch = {}
+        if batch:
+            pipe.zadd(staging_key, batch)
+        pipe.execute()
+
+        if loaded:
+            self.client.rename(staging_key, self.key)
+        else:
+            # Nothing was staged (RENAME would fail), so the ranking is just empty
+            self.client.delete(self.key)
+
+    def update(self, student_id, points):
+        self.client.zadd(self.key, {student_id: points})
+
+    def remove(self, student_id):
+        self.client.zrem(self.key, student_id)
+
+    def top(self, n=10):
+        return [
+            (student_id, int(points))
+            for student_id, points in self.client.zrevrange(self.key, 0, n - 1, withscores=True)
+        ]
+
+    def rank(self, student_id):
+        rank = self.client.zrevrank(self.key, student_id)
+        return None if rank is None else rank + 1
@@ -0,0 +1,173 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+
+
+class JsonStudentStore:
+    """The original whole-file student_data.json storage
+
+    Every save rewrites the file, so it only suits small classes and
+    local testing.
+    """
+
+    def __init__(self, path='student_data.json'):
+        self.path = path
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, student_id):
+        return self._load().get(student_id)
+
+    def exists(self, student_id):
+        return student_id in self._load()
+
+    def save(self, student_id, record):
+        data = self._load()
+        data[student_id] = record
+        with open(self.path, 'w') as f:
+            json.dump(data, f)
+
+    def delete(self, student_id):
+        data = self._load()
+        if data.pop(student_id, None) is not None:
+            with open(self.path, 'w') as f:
+                json.dump(data, f)
+
+    def ids(self):
+        return list(self._load())
+
+    def count(self):
+        return len(self._load())
+
+    def points(self):
+        return [(student_id, record.get("points", 0)) for student_id, record in self._load().items()]
+
+
+class SQLiteStudentStore:
+    """One row per student in a WAL-mode SQLite database
+
+    Saving an attempt upserts a single row, and lookups go through the
+    primary key. Points are also kept in their own indexed column so
+    rankings can be read without decoding every record. On first use an
+    existing student_data.json is imported once.
+    """
+
+    def __init__(self, path='student_data.sqlite3', import_json='student_data.json'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS students (
+                student_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                points INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS students_points ON students (points DESC)")
+        self._conn.commit()
+
+        if import_json and os.path.exists(import_json) and self.count() == 0:
+            for student_id, record in JsonStudentStore(import_json)._load().items():
+                self.save(student_id, record)
+
+    def get(self, student_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM students WHERE student_id = ?", (student_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def exists(self, student_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM students WHERE student_id = ?", (student_id,)
+            ).fetchone()
+        return row is not None
+
+    def save(self, student_id, record):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO students (student_id, name, points, data) VALUES (?, ?, ?, ?)
+                ON CONFLICT (student_id) DO UPDATE SET
+                    name = excluded.name, points = excluded.points, data = excluded.data
+                """,
+                (student_id, record.get("name", ""), record.get("points", 0), json.dumps(record)),
+            )
+            self._conn.commit()
+
+    def delete(self, student_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM students WHERE student_id = ?", (student_id,))
+            self._conn.commit()
+
+    def ids(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT student_id FROM students")]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def points(self):
+        with self._lock:
+            return self._conn.execute("SELECT student_id, points FROM students").fetchall()
+
+
+class StudentRecords(MutableMapping):
+    """Dict-like view of a student store
+
+    Records are fetched on first access and cached. Changes stay in
+    memory until flush() writes them, so callers save only the students
+    they actually changed.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._cache = {}
+
+    def __getitem__(self, student_id):
+        if student_id not in self._cache:
+            record = self.store.get(student_id)
+            if record is None:
+                raise KeyError(student_id)
+            self._cache[student_id] = record
+        return self._cache[student_id]
+
+    def __setitem__(self, student_id, record):
+        self._cache[student_id] = record
+
+    def __delitem__(self, student_id):
+        self._cache.pop(student_id, None)
+        self.store.delete(student_id)
+
+    def __contains__(self, student_id):
+        return student_id in self._cache or self.store.exists(student_id)
+
+    def __iter__(self):
+        return iter(set(self.store.ids()) | set(self._cache))
+
+    def __len__(self):
+        return len(set(self.store.ids()) | set(self._cache))
+
+    def flush(self, student_id=None):
+        """Persist one student's record, or every record loaded so far"""
+        student_ids = [student_id] if student_id is not None else list(self._cache)
+        for sid in student_ids:
+            self.store.save(sid, self._cache[sid])
+
+    def reload(self):
+        """Forget cached records so the next access reads the store again"""
+        self._cache.clear()
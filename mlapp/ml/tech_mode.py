@@ -4,17 +4,99 @@ import json
 import random
 import re
 from datetime import datetime
+from functools import lru_cache
 import nltk
-from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
-# You might need to run these once:
-# nltk.download('punkt')
+from nltk.stem import PorterStemmer
+# You might need to run this once:
 # nltk.download('stopwords')
 
+from mlapp.ml.student_ranking import SortedRanking
+from mlapp.ml.student_store import SQLiteStudentStore, StudentRecords
+
+WORD_PATTERN = re.compile(r'\w+')
+_stemmer = PorterStemmer()
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Porter stem, memoised since explanations reuse a small vocabulary"""
+    return _stemmer.stem(word)
+
+@lru_cache(maxsize=1)
+def get_stop_words():
+    """English stopwords, loaded once per process"""
+    return frozenset(stopwords.words('english'))
+
+class ConceptMatcher:
+    """A topic's concepts compiled for fast matching against explanations
+
+    A concept counts as covered when any of its words appears in the
+    explanation, compared by Porter stem so "attracts" matches
+    "attraction". Concept words that are not plain words (formulas such as
+    "a²+b²=c²") are matched literally with one compiled alternation.
+    """
+
+    def __init__(self, concepts):
+        self.concepts = list(concepts)
+        self.by_stem = {}
+        literals = {}
+        for index, concept in enumerate(self.concepts):
+            for word in concept.lower().split():
+                if WORD_PATTERN.fullmatch(word):
+                    self.by_stem.setdefault(stem(word), set()).add(index)
+                else:
+                    literals.setdefault(word, set()).add(index)
+
+        self.by_literal = literals
+        self.literal_pattern = re.compile(
+            "|".join(re.escape(word) for word in sorted(literals, key=len, reverse=True))
+        ) if literals else None
+
+    def match(self, explanation):
+        """Return the set of concepts the explanation covers"""
+        lowered = explanation.lower()
+        stop_words = get_stop_words()
+
+        found = set()
+        for word in set(WORD_PATTERN.findall(lowered)):
+            if word not in stop_words:
+                found.update(self.by_stem.get(stem(word), ()))
+        if self.literal_pattern is not None:
+            for literal in set(self.literal_pattern.findall(lowered)):
+                found.update(self.by_literal[literal])
+
+        return {self.concepts[index] for index in found}
+
+# Per-student running counters: each counts the topics in topic_history
+# that satisfy its predicate, and is kept up to date one attempt at a time
+BADGE_COUNTERS = {
+    "perfect_explanations": lambda t: t.get("best_score", 0) >= 90,
+    "quick_improvements": lambda t: t.get("attempts") == 2 and t.get("completed", False),
+    "persistent_completions": lambda t: t.get("attempts", 0) >= 3 and t.get("completed", False),
+}
+
+# Badge rules: (badge_id, counter, threshold). Add a counter above and a
+# rule here to introduce a new badge; no other code needs to change.
+BADGE_RULES = [
+    ("master_explainer", "perfect_explanations", 5),
+    ("quick_learner", "quick_improvements", 3),
+    ("persistent", "persistent_completions", 2),
+]
+
 class TeachBackSystem:
-    def __init__(self):
-        self.student_data = {}
+    def __init__(self, store=None, ranking=None):
+        # Any store with get/exists/save/delete/ids/count/points works here,
+        # e.g. JsonStudentStore for the original student_data.json file
+        self.student_data = StudentRecords(store or SQLiteStudentStore())
+        self.badge_counters = dict(BADGE_COUNTERS)
+        self.badge_rules = list(BADGE_RULES)
+        # Points ranking, loaded once here and then updated with each attempt;
+        # pass a RedisRanking to share it between processes
+        self.ranking = ranking or SortedRanking()
+        self.reload_ranking()
         self.topics = self.load_topics()
+        # (category, topic) -> ConceptMatcher, built on first evaluation
+        self.concept_matchers = {}
         self.badges = {
             "master_explainer": {"name": "Master Explainer", "description": "Explained 5 concepts perfectly"},
             "quick_learner": {"name": "Quick Learner", "description": "Improved explanation after a single hint"},
@@ -65,18 +147,21 @@ class TeachBackSystem:
                 }
             }
 
-    def save_student_data(self):
-        """Save student data to a JSON file"""
-        with open('student_data.json', 'w') as f:
-            json.dump(self.student_data, f)
+    def save_student_data(self, student_id=None):
+        """Save one student's record (or every loaded record) to the store"""
+        self.student_data.flush(student_id)
 
     def load_student_data(self):
-        """Load student data from a JSON file"""
-        try:
-            with open('student_data.json', 'r') as f:
-                self.student_data = json.load(f)
-        except FileNotFoundError:
-            self.student_data = {}
+        """Drop cached records so they are re-read from the store on next access"""
+        self.student_data.reload()
+
+    def reload_ranking(self):
+        """Rebuild the ranking from every student's points in the store
+
+        Reads the whole population, so call it explicitly (e.g. to pick up
+        other processes' writes), not per login or per stats view.
+        """
+        self.ranking.load(self.student_data.store.points())
 
     def register_student(self, student_id, name):
         """Register a new student or update existing student info"""
@@ -90,11 +175,12 @@ class TeachBackSystem:
                 "created_at": datetime.now().isoformat(),
                 "last_active": datetime.now().isoformat()
             }
+            self.ranking.update(student_id, 0)
         else:
             self.student_data[student_id]["name"] = name
             self.student_data[student_id]["last_active"] = datetime.now().isoformat()
 
-        self.save_student_data()
+        self.save_student_data(student_id)
         return self.student_data[student_id]
 
     def select_topic(self, student_id):
@@ -141,24 +227,36 @@ class TeachBackSystem:
 
         return random.choice(question_templates)
 
+    def get_concept_matcher(self, category, topic):
+        """Compile a topic's key and required concepts once and reuse the matcher"""
+        key = (category, topic)
+        if key not in self.concept_matchers:
+            topic_data = self.topics[category][topic]
+            self.concept_matchers[key] = ConceptMatcher(
+                topic_data["key_concepts"] + topic_data["required_concepts"]
+            )
+        return self.concept_matchers[key]
+
     def evaluate_explanation(self, explanation, category, topic):
         """
         Evaluate the student's explanation
         Returns: score (0-100), feedback, missing_concepts, is_complete
         """
-        topic_data = self.topics[category][topic]
+        return self.evaluate_explanations([explanation], category, topic)[0]
 
-        # Tokenize and clean the explanation
-        tokens = word_tokenize(explanation.lower())
-        stop_words = set(stopwords.words('english'))
-        tokens = [word for word in tokens if word.isalnum() and word not in stop_words]
+    def evaluate_explanations(self, explanations, category, topic):
+        """
+        Evaluate many explanations of one topic (e.g. a whole class) in one call
+        Returns: a list of evaluate_explanation results, in the same order
+        """
+        topic_data = self.topics[category][topic]
+        matcher = self.get_concept_matcher(category, topic)
+        return [self._grade(matcher.match(explanation), topic_data, topic) for explanation in explanations]
 
+    def _grade(self, matched, topic_data, topic):
+        """Turn the set of matched concepts into a score and feedback"""
         # Check for key concepts
-        found_concepts = {}
-        for concept in topic_data["key_concepts"]:
-            # Check for the concept or related terms
-            if concept in tokens or any(c in explanation.lower() for c in concept.split()):
-                found_concepts[concept] = True
+        found_concepts = {concept: True for concept in topic_data["key_concepts"] if concept in matched}
 
         # Check for required concepts
         missing_concepts = []
@@ -218,6 +316,10 @@ class TeachBackSystem:
         if "topic_history" not in student:
             student["topic_history"] = {}
 
+        # Snapshot the topic so badge counters can be adjusted by the difference
+        counters = self.get_badge_counters(student)
+        before = dict(student["topic_history"].get(topic_key, {}))
+
         if topic_key not in student["topic_history"]:
             student["topic_history"][topic_key] = {
                 "attempts": 0,
@@ -243,6 +345,7 @@ class TeachBackSystem:
                 points_earned += 3  # Bonus for getting it right the first time
 
             student["points"] += points_earned
+            self.ranking.update(student_id, student["points"])
 
             # Remove from weak areas if present
             if "weak_areas" in student:
@@ -256,53 +359,47 @@ class TeachBackSystem:
             if [category, topic] not in student["weak_areas"]:
                 student["weak_areas"].append([category, topic])
 
-        # Check for badges
+        # Update badge counters for this topic only, then check for badges
+        for name, predicate in self.badge_counters.items():
+            counters[name] += int(predicate(topic_history)) - int(bool(before) and predicate(before))
         self.check_and_award_badges(student_id)
 
         # Save changes
-        self.save_student_data()
+        self.save_student_data(student_id)
 
         return True
 
+    def get_badge_counters(self, student):
+        """The student's badge counters, backfilling any that are missing
+
+        Students saved before counters existed (or before a new counter was
+        added) get a one-time scan of their topic history.
+        """
+        counters = student.setdefault("badge_counters", {})
+        for name, predicate in self.badge_counters.items():
+            if name not in counters:
+                counters[name] = sum(1 for t in student.get("topic_history", {}).values() if predicate(t))
+        return counters
+
     def check_and_award_badges(self, student_id):
-        """Check if student qualifies for any badges and award them"""
+        """Check if student qualifies for any badges and award them
+        Returns: the list of newly awarded badge ids"""
         student = self.student_data[student_id]
 
         # Initialize badges if not present
         if "badges" not in student:
             student["badges"] = []
 
-        # Check for Master Explainer badge
-        perfect_explanations = 0
-        for topic_data in student.get("topic_history", {}).values():
-            if topic_data.get("best_score", 0) >= 90:
-                perfect_explanations += 1
-
-        if perfect_explanations >= 5 and "master_explainer" not in student["badges"]:
-            student["badges"].append("master_explainer")
-            return "master_explainer"  # Return the newly awarded badge
+        counters = self.get_badge_counters(student)
 
-        # Check for Quick Learner badge
-        quick_improvements = 0
-        for topic_key, topic_data in student.get("topic_history", {}).items():
-            if topic_data.get("attempts") == 2 and topic_data.get("completed", False):
-                quick_improvements += 1
+        # Evaluate every rule in one pass so several badges can be earned at once
+        awarded = []
+        for badge_id, counter, threshold in self.badge_rules:
+            if counters[counter] >= threshold and badge_id not in student["badges"]:
+                student["badges"].append(badge_id)
+                awarded.append(badge_id)
 
-        if quick_improvements >= 3 and "quick_learner" not in student["badges"]:
-            student["badges"].append("quick_learner")
-            return "quick_learner"
-
-        # Check for Persistent badge
-        persistent_completions = 0
-        for topic_data in student.get("topic_history", {}).values():
-            if topic_data.get("attempts", 0) >= 3 and topic_data.get("completed", False):
-                persistent_completions += 1
-
-        if persistent_completions >= 2 and "persistent" not in student["badges"]:
-            student["badges"].append("persistent")
-            return "persistent"
-
-        return None  # No new badges
+        return awarded
 
 class TeachBackCLI:
     """A simple CLI interface for the TeachBack system"""
@@ -491,6 +588,9 @@ def add_custom_topic(system, category, topic, key_concepts, required_concepts, h
     if category not in system.topics:
         system.topics[category] = {}
 
+    # Drop any matcher compiled for the old version of this topic
+    system.concept_matchers.pop((category, topic), None)
+
     system.topics[category][topic] = {
         "key_concepts": key_concepts,
         "required_concepts": required_concepts,
@@ -505,18 +605,18 @@ def add_custom_topic(system, category, topic, key_concepts, required_concepts, h
     return True
 
 def get_student_leaderboard(system, top_n=10):
-    """Get the top students by points"""
-    system.load_student_data()
-
-    # Create a list of (student_id, name, points) tuples
-    students = [(id, data["name"], data.get("points", 0))
-                for id, data in system.student_data.items()]
+    """Get the top students by points
 
-    # Sort by points (descending)
-    students.sort(key=lambda x: x[2], reverse=True)
+    Reads the maintained ranking, so points other processes saved appear
+    after system.reload_ranking() (or straight away with a RedisRanking)
+    """
+    # Only the top N records are looked up
+    return [(student_id, system.student_data[student_id]["name"], points)
+            for student_id, points in system.ranking.top(top_n)]
 
-    # Return top N
-    return students[:top_n]
+def get_student_rank(system, student_id):
+    """Get a student's 1-based position on the points leaderboard"""
+    return system.ranking.rank(student_id)
 
 def display_student_stats(system, student_id):
     """Display detailed stats for a student"""
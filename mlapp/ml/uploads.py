@@ -0,0 +1,101 @@
+# mlapp/ml/uploads.py
+import io
+import mmap
+import os
+from contextlib import contextmanager, nullcontext
+
+from mlapp.ml.scratch import ScratchSpace
+
+# Files at least this big are memory-mapped instead of read through a buffered file
+MMAP_THRESHOLD = int(os.environ.get('UPLOAD_MMAP_THRESHOLD', 8 * 1024 * 1024))
+
+def upload_path(upload):
+    """
+    Path of the file on disk, if it already has one.
+
+    Works for path strings and for Django's TemporaryUploadedFile, whose
+    temporary_file_path() points at the file Django streamed the upload to.
+    Returns None for in-memory uploads and other streams.
+    """
+    if isinstance(upload, (str, os.PathLike)):
+        return os.fspath(upload)
+    temporary_file_path = getattr(upload, 'temporary_file_path', None)
+    if temporary_file_path is not None:
+        return temporary_file_path()
+    return None
+
+class MappedFile(io.RawIOBase):
+    """Read-only file object over an mmap (mmap itself isn't seekable() before Python 3.13)"""
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+
+    def tell(self):
+        return self._mapped.tell()
+
+    def read(self, size=-1):
+        return self._mapped.read(None if size is None or size < 0 else size)
+
+    def readall(self):
+        return self._mapped.read()
+
+    def readinto(self, buffer):
+        data = self._mapped.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+def is_seekable(stream):
+    seekable = getattr(stream, 'seekable', None)
+    return seekable() if callable(seekable) else hasattr(stream, 'seek')
+
+@contextmanager
+def open_upload(upload, scratch=None):
+    """
+    Open a path or uploaded file as a seekable binary stream, without copying it.
+
+    - Files on disk are opened directly, and memory-mapped once they reach
+      MMAP_THRESHOLD so parsers read from the page cache.
+    - In-memory uploads are handed over as they are, rewound before and
+      after use so callers can read them again.
+    - Streams that can't seek (e.g. from remote storage) are first copied
+      into the scratch space, or into a private one removed afterwards.
+
+    Raises:
+        FileNotFoundError: If a path is given that does not exist
+    """
+    path = upload_path(upload)
+    if path is None and not is_seekable(upload):
+        with nullcontext(scratch) if scratch is not None else ScratchSpace() as space:
+            with open_upload(space.save(upload)) as stream:
+                yield stream
+        return
+
+    if path is None:
+        upload.seek(0)
+        try:
+            yield upload
+        finally:
+            upload.seek(0)
+        return
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        # Empty files can't be mapped
+        if size == 0 or size < MMAP_THRESHOLD:
+            yield file
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield MappedFile(mapped)
@@ -0,0 +1,149 @@
+import os
+import uuid
+from itertools import islice
+
+from celery import Task, chain, shared_task
+from celery.result import AsyncResult
+from django.conf import settings
+
+from mlapp.ml.ingestion import clean_text_file, document_type, extract_document
+
+INGESTION_STAGES = ("extract", "clean", "generate")
+INGESTION_MAX_QUESTIONS = 20
+UPLOAD_DIR = "uploads"
+TEXT_DIR = "extracted_texts"
+
+
+def _media_path(directory, prefix, extension):
+    path = os.path.join(settings.MEDIA_ROOT, directory)
+    os.makedirs(path, exist_ok=True)
+    return os.path.join(path, f"{prefix}_{uuid.uuid4().hex}{extension}")
+
+
+def _report(task, job_id, stage, **meta):
+    """ Record which stage a job is in on the job's own result, for ingestion_status() """
+    task.update_state(
+        task_id=job_id,
+        state="PROGRESS",
+        meta={"stage": stage, "step": INGESTION_STAGES.index(stage) + 1, "steps": len(INGESTION_STAGES), **meta},
+    )
+
+
+class IngestionTask(Task):
+    """
+    Base for the pipeline stages.
+
+    The job id is the id of the last stage, so when an earlier stage fails
+    the error is copied onto the job's result; otherwise a poller would see
+    PROGRESS forever.
+    """
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        job_id = kwargs.get("job_id")
+        if job_id and job_id != task_id:
+            self.backend.mark_as_failure(job_id, exc, einfo.traceback)
+
+
+@shared_task(bind=True, base=IngestionTask)
+def extract_document_text(self, upload_path, name=None, *, job_id):
+    """ Stage 1: extract the uploaded file's text with the extractor for its type """
+    _report(self, job_id, "extract", name=name)
+    try:
+        return extract_document(upload_path, _media_path(TEXT_DIR, "extract", ".txt"), name)
+    finally:
+        # The upload was only kept around for this stage
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+
+
+@shared_task(bind=True, base=IngestionTask)
+def clean_document_text(self, text_file, *, job_id):
+    """ Stage 2: normalise the extracted text into one paragraph per line """
+    _report(self, job_id, "clean")
+    cleaned_file = _media_path(TEXT_DIR, "clean", ".txt")
+    paragraphs = clean_text_file(text_file, cleaned_file)
+    os.remove(text_file)
+    _report(self, job_id, "clean", paragraphs=paragraphs)
+    return cleaned_file
+
+
+@shared_task(bind=True, base=IngestionTask)
+def generate_document_questions(self, text_file, *, job_id, max_questions=INGESTION_MAX_QUESTIONS,
+                                questions_per_window=2):
+    """
+    Stage 3: generate questions from the cleaned text.
+
+    The file is streamed through the question generator window by window,
+    so memory stays flat and progress is reported per question. The
+    cleaned text is only an intermediate and is deleted afterwards.
+    """
+    # Imported here so only workers that run this stage load torch
+    from mlapp.ml.mcq_generation import stream_questions_from_pages
+
+    _report(self, job_id, "generate", questions=0, max_questions=max_questions)
+    questions = []
+    try:
+        with open(text_file, encoding="utf-8") as f:
+            for question in islice(stream_questions_from_pages(f, questions_per_window), max_questions):
+                questions.append(question)
+                _report(self, job_id, "generate", questions=len(questions), max_questions=max_questions)
+    finally:
+        os.remove(text_file)
+
+    return {"questions": questions}
+
+
+def save_upload(upload):
+    """
+    Keep an uploaded file under MEDIA_ROOT/uploads so a worker can read it
+    after the request is over. A TemporaryUploadedFile is hard-linked when
+    possible instead of copied.
+    """
+    path = _media_path(UPLOAD_DIR, "upload", document_type(upload.name))
+    if hasattr(upload, "temporary_file_path"):
+        try:
+            os.link(upload.temporary_file_path(), path)
+            return path
+        except OSError:
+            pass  # different filesystem, fall back to copying
+
+    with open(path, "wb") as destination:
+        for chunk in upload.chunks():
+            destination.write(chunk)
+    return path
+
+
+def ingest_document(upload, max_questions=INGESTION_MAX_QUESTIONS, questions_per_window=2):
+    """
+    Queue extract -> clean -> generate for an uploaded document and return
+    straight away.
+
+    Returns the job id to poll with ingestion_status(). Raises
+    UnsupportedDocumentType before anything is queued if no extractor
+    handles the file, and ValueError if max_questions is below 1.
+    """
+    if max_questions < 1:
+        raise ValueError("max_questions must be at least 1")
+    upload_path = save_upload(upload)
+    job_id = uuid.uuid4().hex
+    chain(
+        extract_document_text.s(upload_path, upload.name, job_id=job_id),
+        clean_document_text.s(job_id=job_id),
+        generate_document_questions.s(
+            job_id=job_id, max_questions=max_questions, questions_per_window=questions_per_window
+        ).set(task_id=job_id),
+    ).apply_async()
+    return job_id
+
+
+def ingestion_status(job_id):
+    """ JSON-ready state of an ingestion job: queued, in progress (with stage), done, or failed """
+    result = AsyncResult(job_id)
+    status = {"job_id": job_id, "state": result.state}
+    if result.state == "PROGRESS":
+        status.update(result.info or {})
+    elif result.successful():
+        status.update(result.result)
+    elif result.failed():
+        status["error"] = str(result.result)
+    return status
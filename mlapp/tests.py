@@ -1,3 +1,83 @@
-from django.test import TestCase
+import os
+import random
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from mlapp.ml.document import iter_sentences
+from mlapp.ml.student_store import JsonStudentStore
+from mlapp.ml.tech_mode import BADGE_COUNTERS, TeachBackSystem
+
+
+class BadgeCounterTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = JsonStudentStore(os.path.join(directory.name, "student_data.json"))
+        self.system = TeachBackSystem(store=self.store)
+        self.system.register_student("s1", "Ann")
+
+    def scanned_counters(self, student):
+        """ The counts the old check_and_award_badges got by scanning topic_history """
+        history = student.get("topic_history", {}).values()
+        return {name: sum(1 for topic in history if predicate(topic)) for name, predicate in BADGE_COUNTERS.items()}
+
+    def test_counters_match_a_full_scan_after_every_attempt(self):
+        rng = random.Random(20)
+        for _ in range(300):
+            self.system.update_student_progress(
+                "s1", rng.choice(["science", "math"]), f"topic{rng.randint(0, 7)}",
+                rng.randint(40, 100), rng.random() < 0.5, 1,
+            )
+            student = self.system.student_data["s1"]
+            self.assertEqual(student["badge_counters"], self.scanned_counters(student))
+
+    def test_quick_improvement_is_taken_back_on_a_third_attempt(self):
+        self.system.update_student_progress("s1", "science", "gravity", 50, False, 1)
+        self.system.update_student_progress("s1", "science", "gravity", 80, True, 2)
+        counters = self.system.student_data["s1"]["badge_counters"]
+        self.assertEqual(counters["quick_improvements"], 1)
+        self.assertEqual(counters["persistent_completions"], 0)
+
+        self.system.update_student_progress("s1", "science", "gravity", 85, True, 3)
+        self.assertEqual(counters["quick_improvements"], 0)
+        self.assertEqual(counters["persistent_completions"], 1)
+
+    def test_missing_counters_are_backfilled_from_history(self):
+        for index in range(5):
+            self.system.update_student_progress("s1", "science", f"topic{index}", 95, True, 1)
+        student = self.system.student_data["s1"]
+        del student["badge_counters"]
+        student["badges"] = []
+
+        self.system.update_student_progress("s1", "math", "algebra", 60, False, 1)
+        self.assertEqual(student["badge_counters"], self.scanned_counters(student))
+        self.assertIn("master_explainer", student["badges"])
+
+    def test_every_due_badge_is_awarded_at_once(self):
+        student = self.system.student_data["s1"]
+        student["topic_history"] = {
+            f"science_topic{index}": {"attempts": 3, "best_score": 95, "completed": True}
+            for index in range(5)
+        }
+        self.assertEqual(self.system.check_and_award_badges("s1"), ["master_explainer", "persistent"])
+        self.assertEqual(self.system.check_and_award_badges("s1"), [])
+
+
+class IterSentencesTests(SimpleTestCase):
+    chunks = ["First one. Second runs", "on and on", "until here. Third", "sentence."]
+    expected = ["First one.", "Second runs on and on until here.", "Third sentence."]
+
+    def test_sentences_split_across_chunks_are_rejoined(self):
+        self.assertEqual(list(iter_sentences(self.chunks)), self.expected)
+
+    def test_fallback_splitter_rejoins_sentences_split_across_chunks(self):
+        with mock.patch("mlapp.ml.document.sent_tokenize", side_effect=LookupError("punkt")):
+            self.assertEqual(list(iter_sentences(self.chunks)), self.expected)
+
+    def test_matches_splitting_the_whole_text(self):
+        text = "Dr. Smith arrived. It was 5 p.m. on a Tuesday! Was it late? Nobody knew."
+        words = text.split()
+        chunks = [" ".join(words[index:index + 3]) for index in range(0, len(words), 3)]
+        self.assertEqual(list(iter_sentences(chunks)), list(iter_sentences([text])))
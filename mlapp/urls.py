@@ -0,0 +1,8 @@
+from django.urls import path
+
+from mlapp import views
+
+urlpatterns = [
+    path("documents/", views.upload_document, name="upload_document"),
+    path("documents/<str:job_id>/", views.document_status, name="ingestion_status"),
+]
@@ -1,3 +1,36 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
 
-# Create your views here.
+from mlapp.ml.ingestion import UnsupportedDocumentType
+from mlapp.tasks import INGESTION_MAX_QUESTIONS, ingest_document, ingestion_status
+
+
+@require_POST
+def upload_document(request):
+    """ Queue an uploaded document for question generation; returns 202 with the job to poll """
+    document = request.FILES.get("document")
+    if document is None:
+        return JsonResponse({"error": "No document uploaded"}, status=400)
+
+    try:
+        max_questions = int(request.POST.get("max_questions", INGESTION_MAX_QUESTIONS))
+    except ValueError:
+        return JsonResponse({"error": "max_questions must be a number"}, status=400)
+    if max_questions < 1:
+        return JsonResponse({"error": "max_questions must be at least 1"}, status=400)
+
+    try:
+        job_id = ingest_document(document, max_questions=max_questions)
+    except UnsupportedDocumentType as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(
+        {"job_id": job_id, "status_url": reverse("ingestion_status", args=[job_id])},
+        status=202,
+    )
+
+
+@require_GET
+def document_status(request, job_id):
+    return JsonResponse(ingestion_status(job_id))
@@ -21,6 +21,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 # Define the patterns directly here
 websocket_urlpatterns = [
     re_path(r'ws/leaderboard/?$', LeaderboardConsumer.as_asgi()),
+    re_path(
+        r'ws/leaderboard/(?P<scope>quiz|classroom)/(?P<room_id>[A-Za-z0-9_-]{1,64})/?$',
+        LeaderboardConsumer.as_asgi(),
+    ),
 ]
 
 application = ProtocolTypeRouter(
@@ -1,5 +1,7 @@
 import os
+import threading
 from celery import Celery
+from celery.signals import worker_process_init
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
 
@@ -13,3 +15,36 @@ celery_app.autodiscover_tasks()
 @celery_app.task(bind=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")
+
+
+@worker_process_init.connect
+def warm_up_ml_models(**kwargs):
+    """
+    Load question-generation models once per worker, before the first task needs them.
+
+    Celery kills a pool child whose worker_process_init handlers take more
+    than a few seconds, and importing torch and loading a model takes much
+    longer, so the loading runs in a background thread. A task that needs
+    a model before it is ready waits on the registry's per-model lock.
+    """
+    from django.conf import settings
+    from mlapp.ml.model_registry import registry
+
+    registry.idle_timeout = getattr(settings, "ML_MODEL_IDLE_TIMEOUT", None)
+
+    model_names = getattr(settings, "ML_WARM_UP_MODELS", [])
+    if not model_names:
+        return
+
+    threading.Thread(target=_load_models, args=(model_names,), name="ml-warm-up", daemon=True).start()
+
+
+def _load_models(model_names):
+    from mlapp.ml.mcq_generation import get_question_generator
+
+    for model_name in model_names:
+        try:
+            get_question_generator(model_name)
+        except Exception as e:
+            # The model will be loaded (or fail properly) on first use instead
+            print(f"Warm-up of {model_name} failed: {e}")
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'channels',
     'leaderboard',
+    'mlapp',
     'daphne',
     'django.contrib.staticfiles',
     'django_celery_beat',
@@ -129,6 +130,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded documents waiting for ingestion, and extracted texts
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -163,6 +168,31 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Redis used by the live leaderboard (consumers and backup tasks)
+LEADERBOARD_REDIS_URL = "redis://127.0.0.1:6379/0"
+LEADERBOARD_REDIS_MAX_CONNECTIONS = 50
+LEADERBOARD_REDIS_POOL_TIMEOUT = 5
+LEADERBOARD_REDIS_SOCKET_TIMEOUT = 5
+LEADERBOARD_REDIS_CONNECT_TIMEOUT = 2
+LEADERBOARD_TOP_N = 10
+LEADERBOARD_TOP_N_MAX = 100
+LEADERBOARD_AROUND_ME_WINDOW = 5
+LEADERBOARD_AROUND_ME_MAX = 25
+# Seconds between coalesced leaderboard broadcasts
+LEADERBOARD_BROADCAST_INTERVAL = 0.2
+# Score increments are written to Redis in batches of up to this many users,
+# or after this many seconds, whichever comes first
+LEADERBOARD_WRITE_BUFFER_SIZE = 500
+LEADERBOARD_WRITE_BUFFER_INTERVAL = 0.005
+
+# Question-generation models loaded when each Celery worker process starts,
+# and how long (seconds) an unused model stays in memory (None = forever)
+ML_WARM_UP_MODELS = ["t5-small"]
+ML_MODEL_IDLE_TIMEOUT = None
+
 CELERY_BROKER_URL="redis://127.0.0.1:6379/0"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
+# Task results and progress, polled by the document ingestion status view
+CELERY_RESULT_BACKEND = "redis://127.0.0.1:6379/0"
+CELERY_RESULT_SERIALIZER = "json"